@@ -13,45 +13,523 @@
 #	
 #	ADC.Setup(Address)  # Check it by sudo i2cdetect -y -1
 #	ADC.read(channal)	# Channal range from 0 to 3
+#	ADC.read_all()		# [AIN0, AIN1, AIN2, AIN3] in one transaction
+#	ADC.read_channels([0, 1, 2])	# only the listed channels
 #	ADC.write(Value)	# Value range from 0 to 255		
+#	ADC.write_block(Values)	# several DAC values in one transaction
+#	ADC.set_pipelined(True)	# 1 transaction per streaming read
+#	ADC.set_freshness(0.01)	# share reads between threads (seconds)
+#	print(ADC.device.stats.summary())	# latency / error statistics
+#	ADC.start_stats_report(60)	# print that summary every minute
+#
+#		Several boards (0x48-0x4F) and/or I2C buses:
+#	adc2 = ADC.Device(0x49, busnum=1)	# same methods as above
+#	group = ADC.DeviceGroup([adc1, adc2, adc3])
+#	group.read_all()	# {(busnum, address): [AIN0..AIN3]}, buses in parallel
+#
+#		Run without hardware: PCF8591_BACKEND=sim, or
+#	python3 sim_run.py <script.py>
 #
 #------------------------------------------------------
-import smbus2 as smbus
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Control byte bits (datasheet fig. 6)
+ANALOG_OUTPUT_ENABLE = 0x40
+AUTO_INCREMENT = 0x04
+
+class BusArbiter:
+	# Serializes every logical ADC operation (control byte + reads) so
+	# threads sharing the device cannot interleave transactions, and
+	# coalesces reads of the same channel: a request arriving within
+	# `freshness` seconds of the last physical read of that channel gets
+	# its value instead of touching the bus. Callers queued on the lock
+	# behind an in-flight read therefore share its result.
+	def __init__(self, freshness=0.0):
+		self.lock = threading.RLock()
+		self.freshness = freshness
+		self.physical_reads = 0
+		self.coalesced_reads = 0
+		self._cache = {}	# (address, chn) -> (time sampled, value)
+
+	def _fresh(self, key, now):
+		hit = self._cache.get(key)
+		if hit is not None and now - hit[0] <= self.freshness:
+			return hit
+		return None
+
+	def read(self, key, do_read):
+		# coalescing is decided (and counted) under the lock, so the
+		# physical/coalesced counters are exact with concurrent readers
+		with self.lock:
+			now = time.monotonic()
+			if self.freshness > 0:
+				hit = self._fresh(key, now)
+				if hit is not None:
+					self.coalesced_reads += 1
+					return hit[1]
+			value = do_read()
+			self.physical_reads += 1
+			self._cache[key] = (now, value)
+			return value
+
+	def read_many(self, keys, do_read):
+		# keys read together in one frame; served from cache only if all fresh
+		with self.lock:
+			now = time.monotonic()
+			if self.freshness > 0:
+				hits = [self._fresh(key, now) for key in keys]
+				if all(hit is not None for hit in hits):
+					self.coalesced_reads += len(keys)
+					return [hit[1] for hit in hits]
+			values = do_read()
+			self.physical_reads += len(keys)
+			for key, value in zip(keys, values):
+				self._cache[key] = (now, value)
+			return values
+
+	def invalidate(self):
+		with self.lock:
+			self._cache.clear()
+
+# Bus backends provide write_byte / read_byte / write_byte_data /
+# write_read / write_bytes / close. Any object with these methods can be
+# plugged in with use_backend(), e.g. pcf8591_sim.SimBus.
+class SMBusBackend:
+	# smbus2 on /dev/i2c-<busnum>
+	def __init__(self, busnum=1):
+		import smbus2
+		self._bus = smbus2.SMBus(busnum)
+		self._msg = smbus2.i2c_msg
+
+	def write_byte(self, addr, val):
+		self._bus.write_byte(addr, val)
+
+	def read_byte(self, addr):
+		return self._bus.read_byte(addr)
+
+	def write_byte_data(self, addr, reg, val):
+		self._bus.write_byte_data(addr, reg, val)
+
+	def write_read(self, addr, data, length):
+		# one combined transaction: write, repeated start, read
+		wr = self._msg.write(addr, data)
+		rd = self._msg.read(addr, length)
+		self._bus.i2c_rdwr(wr, rd)
+		return list(rd)
+
+	def write_bytes(self, addr, data):
+		# plain write of any length (SMBus block writes stop at 32 bytes)
+		self._bus.i2c_rdwr(self._msg.write(addr, data))
+
+	def close(self):
+		self._bus.close()
+
+def open_backend(busnum=1):
+	# PCF8591_BACKEND=sim selects the emulator instead of real hardware
+	if os.environ.get('PCF8591_BACKEND', 'smbus') == 'sim':
+		import pcf8591_sim
+		return pcf8591_sim.SimBus()
+	# for RPI version 1, use busnum=0
+	return SMBusBackend(busnum)
+
+class BusPool:
+	# One backend and one arbiter per I2C bus number, shared by every
+	# device on that bus. Backends are opened on first use, so importing
+	# this module or creating devices never touches the hardware.
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._buses = {}
+		self._arbiters = {}
+
+	def bus(self, busnum):
+		backend = self._buses.get(busnum)
+		if backend is None:
+			with self._lock:
+				backend = self._buses.get(busnum)
+				if backend is None:
+					backend = self._buses[busnum] = open_backend(busnum)
+		return backend
+
+	def arbiter(self, busnum):
+		with self._lock:
+			arbiter = self._arbiters.get(busnum)
+			if arbiter is None:
+				arbiter = self._arbiters[busnum] = BusArbiter()
+			return arbiter
+
+	def install(self, busnum, backend):
+		# plug in a backend (emulator, wrapper, ...) instead of opening one
+		with self._lock:
+			self._buses[busnum] = backend
+		self.arbiter(busnum).invalidate()
+
+	def close(self):
+		with self._lock:
+			for backend in self._buses.values():
+				backend.close()
+			self._buses.clear()
+
+pool = BusPool()
+
+def use_backend(backend, busnum=1):
+	pool.install(busnum, backend)
+
+class TransactionStats:
+	# Per-device bus statistics, keyed by (channel label, operation):
+	# transaction count, errors, total/max latency and a log2 latency
+	# histogram (bucket b holds latencies of 2**(b-1) to 2**b - 1 us).
+	# Recording costs two perf_counter_ns() calls and a few integer ops;
+	# it always runs under the bus arbiter lock, so it needs no lock of its
+	# own. snapshot() may run on another thread (the reporter), so it
+	# copies the entries under that same `lock`.
+	BUCKETS = 24	# up to ~8 s
+
+	def __init__(self, name, lock=None):
+		self.name = name
+		self.enabled = True
+		self.lock = threading.RLock() if lock is None else lock
+		self.reset()
+
+	def reset(self):
+		self.entries = {}	# key -> [count, errors, total_ns, max_ns, histogram]
+		self.retries = 0	# reads repeated after a failed transaction
+		self.error_burst = 0	# consecutive failed transactions right now
+		self.max_error_burst = 0
+		self.last_error = None
+		self.since = time.time()
+
+	def record(self, key, ns, error=None):
+		entry = self.entries.get(key)
+		if entry is None:
+			entry = self.entries[key] = [0, 0, 0, 0, [0] * self.BUCKETS]
+		entry[0] += 1
+		entry[2] += ns
+		if ns > entry[3]:
+			entry[3] = ns
+		entry[4][min((ns // 1000).bit_length(), self.BUCKETS - 1)] += 1
+		if error is None:
+			self.error_burst = 0
+		else:
+			entry[1] += 1
+			self.error_burst += 1
+			if self.error_burst > self.max_error_burst:
+				self.max_error_burst = self.error_burst
+			self.last_error = (time.time(), key, repr(error))
+
+	@staticmethod
+	def _percentile_us(histogram, count, q):
+		# upper bound of the bucket holding the q-th quantile
+		target = q * count
+		seen = 0
+		for bucket, n in enumerate(histogram):
+			seen += n
+			if n and seen >= target:
+				return (1 << bucket) - 1 if bucket else 0
+		return 0
+
+	def snapshot(self):
+		with self.lock:
+			entries = [(key, e[:4] + [list(e[4])]) for key, e in self.entries.items()]
+			retries, max_error_burst = self.retries, self.max_error_burst
+			last_error = self.last_error
+		keys = {}
+		for (label, op), (count, errors, total_ns, max_ns, hist) in sorted(entries):
+			keys["%s %s" % (label, op)] = {
+				'count': count,
+				'errors': errors,
+				'mean_us': total_ns / count / 1000.0,
+				'max_us': max_ns / 1000.0,
+				'p50_us': self._percentile_us(hist, count, 0.5),
+				'p99_us': self._percentile_us(hist, count, 0.99),
+				'histogram': list(hist),
+			}
+		return {
+			'device': self.name,
+			'seconds': time.time() - self.since,
+			'transactions': sum(e[0] for _, e in entries),
+			'errors': sum(e[1] for _, e in entries),
+			'retries': retries,
+			'max_error_burst': max_error_burst,
+			'last_error': last_error,
+			'keys': keys,
+		}
 
-# for RPI version 1, use "bus = smbus.SMBus(0)"
-bus = smbus.SMBus(1)
+	def summary(self):
+		snap = self.snapshot()
+		rate = snap['transactions'] / snap['seconds'] if snap['seconds'] > 0 else 0.0
+		lines = ["%s: %d transactions (%.1f/s), %d errors, %d retries, max error burst %d"
+			% (self.name, snap['transactions'], rate, snap['errors'], snap['retries'],
+			snap['max_error_burst'])]
+		for key, k in snap['keys'].items():
+			lines.append("  %-24s n=%-8d err=%-4d mean=%7.1fus p50<=%6dus p99<=%6dus max=%8.1fus"
+				% (key, k['count'], k['errors'], k['mean_us'], k['p50_us'], k['p99_us'], k['max_us']))
+		if snap['last_error'] is not None:
+			when, key, err = snap['last_error']
+			lines.append("  last error %s (%s %s): %s"
+				% (time.strftime('%H:%M:%S', time.localtime(when)), key[0], key[1], err))
+		return "\n".join(lines)
+
+class Device:
+	# One PCF8591 chip. Pipelined mode (opt-in): the chip keeps converting
+	# the selected channel and every read returns the conversion started by
+	# the previous read, so a sample is one read old but costs a single
+	# transaction instead of control byte + dummy read + read. `selected`
+	# is the channel the chip currently has selected (None = unknown).
+	def __init__(self, address=0x48, busnum=1):
+		self.address = address
+		self.busnum = busnum
+		self.pipelined = False
+		self.selected = None
+		self.stats = TransactionStats("PCF8591 0x%02X bus %d" % (address, busnum),
+			pool.arbiter(busnum).lock)
+
+	def __repr__(self):
+		return "Device(0x%02X, busnum=%d)" % (self.address, self.busnum)
+
+	def _tx(self, label, op, *args):
+		# one bus transaction, timed and counted in self.stats
+		func = getattr(self.bus, op)
+		if not self.stats.enabled:
+			return func(*args)
+		t0 = time.perf_counter_ns()
+		try:
+			result = func(*args)
+		except Exception as e:
+			self.stats.record((label, op), time.perf_counter_ns() - t0, e)
+			raise
+		self.stats.record((label, op), time.perf_counter_ns() - t0)
+		return result
+
+	@property
+	def bus(self):
+		return pool.bus(self.busnum)
+
+	@property
+	def arbiter(self):
+		return pool.arbiter(self.busnum)
+
+	def set_pipelined(self, enabled=True):
+		with self.arbiter.lock:
+			self.pipelined = enabled
+			self.selected = None
+
+	def read(self, chn): #channel
+		return self.arbiter.read((self.address, chn), lambda: self._read(chn))
+
+	def _read(self, chn):
+		if self.pipelined:
+			return self._read_pipelined(chn)
+		label = "AIN%d" % chn
+		try:
+			if chn in (0, 1, 2, 3):
+				self._tx(label, 'write_byte', self.address, 0x40 | chn)
+			self._tx(label, 'read_byte', self.address) # dummy read to start conversion
+		except Exception as e:
+			print ("Address: %s" % self.address)
+			print (e)
+			self.stats.retries += 1
+		return self._tx(label, 'read_byte', self.address)
+
+	def _read_pipelined(self, chn):
+		try:
+			label = "AIN%d" % chn
+			if chn == self.selected:
+				return self._tx(label, 'read_byte', self.address)
+			# new channel: select it and drop the other channel's stale byte
+			# in the same transaction; the second byte is a fresh conversion
+			value = self._tx(label, 'write_read', self.address, [ANALOG_OUTPUT_ENABLE | chn], 2)[1]
+			self.selected = chn
+			return value
+		except Exception as e:
+			self.selected = None
+			print ("Address: %s" % self.address)
+			print (e)
+			raise
+
+	def read_channels(self, chns):
+		chns = list(chns)
+		return self.arbiter.read_many([(self.address, chn) for chn in chns],
+			lambda: self._read_channels(chns))
+
+	def _read_channels(self, chns):
+		# Read several channels with one combined write/read (i2c_rdwr) transaction.
+		# With the auto-increment flag set, every byte clocked out starts
+		# the conversion of the next channel, so after the control byte we
+		# read one stale byte (previous conversion) plus one byte per channel
+		# of the span first..last.
+		if not chns:
+			return []
+		for chn in chns:
+			if chn not in (0, 1, 2, 3):
+				raise ValueError("Channel must be 0-3, got %r" % (chn,))
+		first = min(chns)
+		count = max(chns) - first + 1
+		self.selected = None	# auto-increment leaves the chip on another channel
+		try:
+			ctrl = ANALOG_OUTPUT_ENABLE | AUTO_INCREMENT | first
+			label = "AIN%d-%d" % (first, first + count - 1)
+			values = self._tx(label, 'write_read', self.address, [ctrl], count + 1)[1:]
+		except Exception as e:
+			print ("Address: %s" % self.address)
+			print (e)
+			self.stats.retries += 1
+			return [self._read(chn) for chn in chns]
+		return [values[chn - first] for chn in chns]
+
+	def read_burst(self, chn, n):
+		# n back-to-back conversions of one channel in a single combined
+		# transaction: without auto-increment every byte clocked out starts
+		# the next conversion of the same channel, so after the control
+		# byte we read one stale byte plus n fresh ones. Used for
+		# oversampling (see oversample.py); never coalesced by the arbiter.
+		if chn not in (0, 1, 2, 3):
+			raise ValueError("Channel must be 0-3, got %r" % (chn,))
+		if n < 1:
+			raise ValueError("Burst length must be >= 1, got %r" % (n,))
+		with self.arbiter.lock:
+			try:
+				values = self._tx("AIN%d*" % chn, 'write_read', self.address,
+					[ANALOG_OUTPUT_ENABLE | chn], n + 1)[1:]
+			except Exception as e:
+				self.selected = None
+				print ("Address: %s" % self.address)
+				print (e)
+				self.stats.retries += 1
+				return [self._read(chn) for _ in range(n)]
+			self.selected = chn	# the chip is left converting this channel
+			return values
+
+	def read_frames(self, chns, n):
+		# n successive frames of several channels in a single combined
+		# transaction: with auto-increment the chip cycles AIN0..AIN3 and
+		# wraps around, so after the control byte we read one stale byte
+		# plus 4 bytes per frame. Oversamples every sensor of one board at
+		# once (Lab 6 multi-sensor monitor); never coalesced by the arbiter.
+		chns = list(chns)
+		for chn in chns:
+			if chn not in (0, 1, 2, 3):
+				raise ValueError("Channel must be 0-3, got %r" % (chn,))
+		if n < 1:
+			raise ValueError("Frame count must be >= 1, got %r" % (n,))
+		if not chns:
+			return [[] for _ in range(n)]
+		first = min(chns)
+		with self.arbiter.lock:
+			self.selected = None
+			try:
+				values = self._tx("AIN%d+*" % first, 'write_read', self.address,
+					[ANALOG_OUTPUT_ENABLE | AUTO_INCREMENT | first], 4 * n + 1)[1:]
+			except Exception as e:
+				print ("Address: %s" % self.address)
+				print (e)
+				self.stats.retries += 1
+				return [self._read_channels(chns) for _ in range(n)]
+		return [[values[4 * k + (chn - first) % 4] for chn in chns] for k in range(n)]
+
+	def read_all(self):
+		return self.read_channels((0, 1, 2, 3))
+
+	def write(self, val):
+		try:
+			temp = val # move string value to temp
+			temp = int(temp) # change string to integer
+			# print temp to see on terminal else comment out
+			ctrl = 0x40
+			with self.arbiter.lock:
+				if self.pipelined and self.selected is not None:
+					ctrl |= self.selected	# keep the pipelined channel selected
+				self._tx('DAC', 'write_byte_data', self.address, ctrl, temp)
+		except Exception as e:
+			print ("Error: Device address: 0x%2X" % self.address)
+			print (e)
+
+	def write_block(self, vals):
+		# Every byte written after the control byte updates the DAC, so a
+		# block of values goes out back to back at bus speed (~11k values/s
+		# at 100 kHz) in one transaction. Errors are left to the caller.
+		ctrl = ANALOG_OUTPUT_ENABLE
+		with self.arbiter.lock:
+			if self.pipelined and self.selected is not None:
+				ctrl |= self.selected
+			self._tx('DAC', 'write_bytes', self.address, [ctrl] + [int(v) for v in vals])
+
+class DeviceGroup:
+	# Reads many devices at once. Devices on the same bus are read one
+	# after the other (the bus is serial); different buses are read in
+	# parallel on one worker thread per bus, so aggregate throughput
+	# scales with the number of buses.
+	def __init__(self, devices):
+		self.devices = list(devices)
+		self._by_bus = {}
+		for dev in self.devices:
+			self._by_bus.setdefault(dev.busnum, []).append(dev)
+		self._executor = ThreadPoolExecutor(max_workers=len(self._by_bus) or 1,
+			thread_name_prefix='pcf8591-bus')
+
+	def read_channels(self, chns):
+		chns = list(chns)
+		def read_bus(devs):
+			return [((dev.busnum, dev.address), dev.read_channels(chns)) for dev in devs]
+		results = {}
+		for future in [self._executor.submit(read_bus, devs) for devs in self._by_bus.values()]:
+			results.update(future.result())
+		return results
+
+	def read_all(self):
+		return self.read_channels((0, 1, 2, 3))
+
+	def close(self):
+		self._executor.shutdown(wait=True)
+
+# Module-level API: one default device, created by setup()
+device = None
 
 #check your PCF8591 address by type in 'sudo i2cdetect -y -1' in terminal.
-def setup(Addr):
-	global address
+def setup(Addr, busnum=1):
+	global address, device
 	address = Addr
+	device = Device(Addr, busnum)
+
+def set_pipelined(enabled=True):
+	device.set_pipelined(enabled)
+
+def set_freshness(seconds):
+	# 0 disables coalescing (every read hits the bus, still serialized)
+	device.arbiter.freshness = seconds
+	device.arbiter.invalidate()
 
 def read(chn): #channel
-	try:
-		if chn == 0:
-			bus.write_byte(address,0x40)
-		if chn == 1:
-			bus.write_byte(address,0x41)
-		if chn == 2:
-			bus.write_byte(address,0x42)
-		if chn == 3:
-			bus.write_byte(address,0x43)
-		bus.read_byte(address) # dummy read to start conversion
-	except Exception as e:
-		print ("Address: %s" % address)
-		print (e)
-	return bus.read_byte(address)
+	return device.read(chn)
+
+def read_channels(chns):
+	return device.read_channels(chns)
+
+def read_all():
+	return device.read_all()
+
+def read_burst(chn, n):
+	return device.read_burst(chn, n)
 
 def write(val):
-	try:
-		temp = val # move string value to temp
-		temp = int(temp) # change string to integer
-		# print temp to see on terminal else comment out
-		bus.write_byte_data(address, 0x40, temp)
-	except Exception as e:
-		print ("Error: Device address: 0x%2X" % address)
-		print (e)
+	device.write(val)
+
+def write_block(vals):
+	device.write_block(vals)
+
+def start_stats_report(interval=60.0, devices=None):
+	# print the statistics summary of `devices` (default: the setup()
+	# device) every `interval` seconds from a daemon thread
+	def report():
+		while True:
+			time.sleep(interval)
+			for dev in devices or [device]:
+				print (dev.stats.summary())
+	thread = threading.Thread(target=report, name='pcf8591-stats', daemon=True)
+	thread.start()
+	return thread
 
 if __name__ == "__main__":
 	setup(0x48)
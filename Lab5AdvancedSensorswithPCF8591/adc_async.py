@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: asyncio interface to the PCF8591
+===========================================
+
+Wraps PCF8591.py for asyncio programs. Every bus operation runs on one
+dedicated worker thread (the I2C bus is serial anyway), so awaiting a read
+never blocks the event loop and other tasks keep running.
+
+Usage:
+    import asyncio
+    import PCF8591 as ADC
+    from adc_async import AsyncADC
+
+    async def main():
+        ADC.setup(0x48)
+        async with AsyncADC() as adc:
+            value = await adc.read(3)
+            async for x, y, btn in adc.stream([0, 1, 2], rate_hz=20):
+                ...
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import PCF8591 as ADC
+
+
+class AsyncADC:
+    """Awaitable PCF8591 reads and writes on a dedicated executor"""
+
+    def __init__(self, executor=None, device=None):
+        self.device = device    # None: the module default from ADC.setup()
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pcf8591')
+        self._executor = executor
+
+    async def _call(self, method, *args):
+        dev = self.device if self.device is not None else ADC.device
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, getattr(dev, method), *args)
+
+    async def read(self, chn):
+        return await self._call('read', chn)
+
+    async def read_channels(self, chns):
+        return await self._call('read_channels', list(chns))
+
+    async def read_burst(self, chn, n):
+        return await self._call('read_burst', chn, n)
+
+    async def read_all(self):
+        return await self._call('read_all')
+
+    async def write(self, val):
+        await self._call('write', val)
+
+    async def stream(self, chns, rate_hz=10.0):
+        """Yield one frame (list of values) per period, at a fixed rate
+
+        Frames are scheduled on absolute deadlines; if the consumer or the
+        bus falls behind, missed periods are skipped rather than bunched.
+        """
+        chns = list(chns)
+        period = 1.0 / rate_hz
+        deadline = time.monotonic()
+        while True:
+            yield await self.read_channels(chns)
+            deadline += period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                deadline = time.monotonic()
+
+    def close(self):
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: PCF8591 read path benchmark
+======================================
+
+Compares the per-channel read path (ADC.read() once per channel), the
+pipelined read path (ADC.set_pipelined(True)) and the auto-increment path
+(ADC.read_all() / ADC.read_channels()) and reports
+bus transactions per frame, frames per second, reads per second and CPU
+time per frame.
+
+A "frame" is one sample of every requested channel. Use --channels 0 for
+single-channel streaming (thermistor.py, sound.py). With --sim the
+benchmark runs against the in-memory emulator (pcf8591_sim.py), so it
+works on any Linux box; --latency adds a per-transaction bus delay.
+
+With --buses N --devices M (emulator only) it instead measures aggregate
+channel throughput of N buses x M boards, read one after the other versus
+with ADC.DeviceGroup (one thread per bus).
+
+With --oversample 1,4,16,64 it measures oversampled acquisition
+(oversample.py) on the first channel: decimated samples per second and raw
+conversions per second for each burst length N. With --sim the channel
+carries a noisy signal with occasional spikes and the spread of each
+decimation method is reported too.
+
+Usage: python3 benchmark.py [--frames N] [--channels 0,1,2,3] [--address 0x48]
+                            [--sim [--latency S]] [--buses N --devices M]
+                            [--no-stats] [--oversample 1,4,16,64]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import PCF8591 as ADC
+import oversample
+import pcf8591_sim
+
+
+class CountingBus:
+    """Wraps the driver bus and counts every I2C transaction"""
+
+    def __init__(self, bus):
+        self._bus = bus
+        self.transactions = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._bus, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.transactions += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+def run_path(name, read_frame, counter, frames, channels):
+    """Time `frames` calls of read_frame() and print one result line"""
+    counter.transactions = 0
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(frames):
+        read_frame()
+    cpu = time.process_time() - cpu_start
+    elapsed = time.perf_counter() - start
+
+    per_frame = counter.transactions / frames
+    fps = frames / elapsed if elapsed > 0 else float('inf')
+    print(f"{name:<16} {per_frame:>6.1f} tx/frame {fps:>10.1f} frames/s "
+          f"{fps * channels:>10.1f} reads/s {cpu / frames * 1e6:>8.1f} µs CPU/frame")
+    return fps
+
+
+def run_pool(args, channels):
+    """Sequential vs DeviceGroup reads over several emulated buses"""
+    devices = []
+    for busnum in range(args.buses):
+        addrs = [0x48 + i for i in range(args.devices)]
+        sims = {addr: pcf8591_sim.SimPCF8591() for addr in addrs}
+        ADC.use_backend(pcf8591_sim.SimBus(sims, latency=args.latency), busnum)
+        devices += [ADC.Device(addr, busnum) for addr in addrs]
+    group = ADC.DeviceGroup(devices)
+
+    print(f"📊 PCF8591 pool benchmark - {args.buses} bus(es) x {args.devices} board(s), "
+          f"channels {channels}, {args.latency * 1e6:.0f} µs/tx")
+    print("=" * 50)
+    reads = len(devices) * len(channels)
+    for name, read_frame in (
+            ("sequential", lambda: [dev.read_channels(channels) for dev in devices]),
+            ("DeviceGroup", lambda: group.read_channels(channels))):
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            read_frame()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {args.frames / elapsed:>10.1f} frames/s "
+              f"{args.frames * reads / elapsed:>10.1f} channel reads/s")
+    group.close()
+
+
+def noisy_signal(level=100.0, noise=1.5, spikes=0.02, seed=0):
+    """Emulator signal: constant level, gaussian noise, random full-scale spikes"""
+    rng = random.Random(seed)
+
+    def signal(t):
+        if rng.random() < spikes:
+            return 255
+        return rng.gauss(level, noise)
+    return signal
+
+
+def run_oversample(args, chn, ns):
+    """Decimated sample rate (and noise with --sim) versus burst length"""
+    if args.sim:
+        level = 100.0
+        sim = pcf8591_sim.SimPCF8591()
+        sim.set_signal(chn, noisy_signal(level))
+        ADC.use_backend(pcf8591_sim.SimBus({args.address: sim}, latency=args.latency))
+    ADC.setup(args.address)
+    ADC.device.stats.enabled = not args.no_stats
+
+    backend = f"emulator, {args.latency * 1e6:.0f} µs/tx" if args.sim else "hardware"
+    print(f"📊 PCF8591 oversampling benchmark - channel {chn}, {args.frames} samples ({backend})")
+    print("=" * 50)
+    for n in ns:
+        start = time.perf_counter()
+        bursts = [ADC.read_burst(chn, n) for _ in range(args.frames)]
+        elapsed = time.perf_counter() - start
+        rate = args.frames / elapsed if elapsed > 0 else float('inf')
+        line = f"N={n:<4} {rate:>10.1f} samples/s {rate * n:>10.1f} conversions/s"
+        if args.sim:
+            for method in oversample.METHODS:
+                values = np.array([oversample.decimate(b, method)['value'] for b in bursts])
+                err = np.sqrt(np.mean((values - level) ** 2))
+                line += f"  {method} rms err {err:6.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PCF8591 read path benchmark")
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--channels', default='0,1,2,3')
+    parser.add_argument('--address', type=lambda v: int(v, 0), default=0x48)
+    parser.add_argument('--sim', action='store_true', help="use the PCF8591 emulator")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="emulated per-transaction latency in seconds")
+    parser.add_argument('--buses', type=int, default=0,
+                        help="emulated buses for the device pool benchmark")
+    parser.add_argument('--devices', type=int, default=1,
+                        help="emulated boards per bus (0x48, 0x49, ...)")
+    parser.add_argument('--no-stats', action='store_true',
+                        help="disable transaction statistics (measure their cost)")
+    parser.add_argument('--oversample', default=None,
+                        help="burst lengths to measure, e.g. 1,4,16,64")
+    args = parser.parse_args()
+
+    channels = [int(c) for c in args.channels.split(',')]
+
+    if args.oversample:
+        run_oversample(args, channels[0], [int(n) for n in args.oversample.split(',')])
+        return
+
+    if args.buses:
+        run_pool(args, channels)
+        return
+
+    if args.sim:
+        ADC.use_backend(pcf8591_sim.SimBus(
+            {args.address: pcf8591_sim.SimPCF8591()}, latency=args.latency))
+    ADC.setup(args.address)
+    ADC.device.stats.enabled = not args.no_stats
+    counter = CountingBus(ADC.device.bus)
+    ADC.use_backend(counter)
+
+    backend = f"emulator, {args.latency * 1e6:.0f} µs/tx" if args.sim else "hardware"
+    print(f"📊 PCF8591 benchmark - channels {channels}, {args.frames} frames ({backend})")
+    print("=" * 50)
+    slow = run_path("per-channel", lambda: [ADC.read(c) for c in channels],
+                    counter, args.frames, len(channels))
+    ADC.set_pipelined(True)
+    run_path("pipelined", lambda: [ADC.read(c) for c in channels],
+             counter, args.frames, len(channels))
+    ADC.set_pipelined(False)
+    fast = run_path("read_channels", lambda: ADC.read_channels(channels),
+                    counter, args.frames, len(channels))
+    print("=" * 50)
+    print(f"Speed-up: x{fast / slow:.2f}")
+    if not args.no_stats:
+        print(ADC.device.stats.summary())
+
+
+if __name__ == "__main__":
+    main()
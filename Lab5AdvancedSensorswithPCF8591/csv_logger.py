@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: Buffered background CSV logger
+=========================================
+
+Shared by demo.py and the Lab 6 monitor. log() only timestamps the row and
+appends it to a bounded in-memory queue (a deque: no lock on the fast path,
+unlike queue.Queue). A writer thread keeps the file open, wakes up every
+`batch_interval` seconds to write everything queued as one batch (so log()
+never hands the CPU over to it), and flushes when `flush_rows` rows are
+pending or `flush_interval` seconds have passed, whichever comes first.
+Timestamps are formatted in the writer thread, once per second of data.
+
+Policies:
+    on_full  'block'  log() waits for room in the queue (no data loss)
+             'drop'   log() returns False and counts the row as dropped
+                      (the sampling loop never waits on a slow disk)
+    fsync    'never'  leave durability to the OS
+             'flush'  fsync after every flush (survives power loss,
+                      costs an SD card write per flush)
+             'close'  fsync once when the logger is closed
+
+Rotation (rotate='hour' or 'day'): rows go to one file per local hour or
+day, named after `path` (data.csv -> data_2025-07-05T14.csv), always
+appended, each with its header. data.csv.index.json lists every partition
+with its time span, first/last row time and row count; readers call
+partitions_between() to open only the partitions overlapping a window.
+
+Many files (one log per sensor): loggers created with shared=SharedWriter()
+are all served by that writer's single thread instead of one thread each.
+
+Usage:
+    from csv_logger import CSVLogger
+
+    log = CSVLogger('data.csv', header=['timestamp', 'light', 'sound'],
+                    timestamp_format='%Y-%m-%d %H:%M:%S').start()
+    log.log([light, sound])     # timestamp column added by the logger
+    log.close()                 # writes what is queued, flushes, closes
+
+    hourly = CSVLogger('logs/data.csv', header=[...], rotate='hour',
+                       timestamp_format='%Y-%m-%d %H:%M:%S').start()
+    partitions_between('logs/data.csv', start, end)   # Unix times -> paths
+
+    writer = SharedWriter()
+    logs = [CSVLogger(f'probe{i}.csv', header=[...], shared=writer).start()
+            for i in range(24)]         # 24 files, one writer thread
+    writer.close()                      # closes every logger, then the thread
+
+    python3 csv_logger.py --rows 20000             # cost per row vs open/append/close
+    python3 csv_logger.py --rows 2000 --rate 200   # paced like a sampling loop
+"""
+
+import argparse
+import collections
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Partition file suffix (local time) for each rotation period
+ROTATIONS = {'hour': '%Y-%m-%dT%H', 'day': '%Y-%m-%d'}
+
+
+def index_path(path):
+    """Index file of a rotated log (data.csv -> data.csv.index.json)"""
+    return path + '.index.json'
+
+
+def load_index(path):
+    """Partition entries of a rotated log, oldest first ([] if none)"""
+    try:
+        with open(index_path(path)) as file:
+            return json.load(file)['partitions']
+    except FileNotFoundError:
+        return []
+
+
+def partitions_between(path, start=None, end=None):
+    """Paths of the partitions whose time span overlaps [start, end)"""
+    folder = os.path.dirname(path)
+    return [os.path.join(folder, entry['file']) for entry in load_index(path)
+            if (start is None or entry['span_end'] > start)
+            and (end is None or entry['span_start'] < end)]
+
+
+class CSVLogger:
+    """Bounded queue + writer thread appending rows to one CSV file"""
+
+    def __init__(self, path, header=None, mode='a', timestamp_format=None,
+                 maxsize=10000, batch_interval=0.05, flush_rows=1000, flush_interval=1.0,
+                 fsync='close', on_full='block', rotate=None, shared=None):
+        if rotate is not None and rotate not in ROTATIONS:
+            raise ValueError(f"rotate must be None, 'hour' or 'day', got {rotate!r}")
+        if fsync not in ('never', 'flush', 'close'):
+            raise ValueError(f"fsync must be 'never', 'flush' or 'close', got {fsync!r}")
+        if on_full not in ('block', 'drop'):
+            raise ValueError(f"on_full must be 'block' or 'drop', got {on_full!r}")
+        self.path = path
+        self.header = header
+        self.maxsize = maxsize
+        self.mode = mode
+        self.timestamp_format = timestamp_format
+        self.timestamped = timestamp_format is not None
+        # '%f' (sub-second) formats are rendered per row, others once per second
+        self._subsecond = self.timestamped and '%f' in timestamp_format
+        self.batch_interval = batch_interval
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.on_full = on_full
+        self.rotate = rotate
+        self.shared = shared        # SharedWriter, or None for an own thread
+
+        self.rows_logged = 0
+        self.rows_dropped = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.flushes = 0
+        self.errors = 0
+        self.max_backlog = 0
+        self._rows = collections.deque()
+        self._room = threading.Condition()     # on_full='block' waits here
+        self._waiters = collections.deque()    # flush() events
+        self._closing = False
+        self._file = None
+        self._writer = None
+        self._thread = None
+        self._running = False
+        self._closed = threading.Event()
+        self._wake = shared.wake if shared is not None else threading.Event()
+        self._pending = 0           # rows written since the last flush
+        self._flush_at = None
+        self._ts_second = None
+        self._ts_text = ''
+        self._span = None           # (start, end) of the open partition
+        self._entry = None          # its index entry
+        self._index = {}            # partition file name -> index entry
+        self._index_dirty = False
+
+    def start(self):
+        """Open the file (header if new or truncated) and start the writer"""
+        if self._running:
+            return self
+        if self.rotate:
+            # partitions are opened by the writer, from each row's timestamp
+            if not self.timestamped:
+                raise ValueError("rotation needs timestamped rows (timestamp_format)")
+            self._index = {entry['file']: entry for entry in load_index(self.path)}
+        else:
+            self._open(self.path, self.mode)
+        self._closing = False
+        self._closed.clear()
+        self._running = True
+        if self.shared is not None:
+            self.shared.add(self)
+        else:
+            self._thread = threading.Thread(target=self._run, name='csv-logger', daemon=True)
+            self._thread.start()
+        return self
+
+    def log(self, row):
+        """Queue one row; False if it was dropped (on_full='drop')"""
+        item = (time.time(), row) if self.timestamped else row
+        if len(self._rows) >= self.maxsize:
+            if self.on_full == 'drop':
+                self.rows_dropped += 1
+                return False
+            with self._room:
+                while len(self._rows) >= self.maxsize and self._running:
+                    self._wake.set()
+                    self._room.wait(self.batch_interval)
+        self._rows.append(item)
+        self.rows_logged += 1
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every row logged so far is written and flushed"""
+        done = threading.Event()
+        self._waiters.append(done)
+        self._wake.set()
+        return done.wait(timeout)
+
+    def close(self):
+        """Write everything queued, flush (fsync per policy) and close"""
+        if not self._running:
+            return
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        else:
+            self._closed.wait()
+        self._running = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _timestamp(self, t):
+        if self._subsecond:
+            return datetime.fromtimestamp(t).strftime(self.timestamp_format)
+        second = int(t)
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_text = datetime.fromtimestamp(second).strftime(self.timestamp_format)
+        return self._ts_text
+
+    # Subclasses (e.g. a binary format) override _open() and _write_rows()
+
+    @staticmethod
+    def _is_new(path, mode):
+        return mode == 'w' or not os.path.exists(path) or os.path.getsize(path) == 0
+
+    def _open(self, path, mode):
+        new = self._is_new(path, mode)
+        self._file = open(path, mode, newline='')
+        self._writer = csv.writer(self._file)
+        if new and self.header:
+            self._writer.writerow(self.header)
+            self._file.flush()
+
+    def _switch_partition(self, t):
+        # close the current partition, open (append) the one containing t
+        if self._file is not None:
+            self._flush(self.fsync != 'never')
+            self._file.close()
+            self._file = None
+        local = time.localtime(t)
+        if self.rotate == 'hour':
+            start = int(t) - local.tm_min * 60 - local.tm_sec
+            end = start + 3600
+        else:
+            start = int(time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1)))
+            end = int(time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1)))
+        base, ext = os.path.splitext(self.path)
+        path = f"{base}_{time.strftime(ROTATIONS[self.rotate], local)}{ext}"
+        self._open(path, 'a')
+        self._span = (start, end)
+        name = os.path.basename(path)
+        if name not in self._index:
+            self._index[name] = {'file': name, 'span_start': start, 'span_end': end,
+                                 'first': t, 'last': t, 'rows': 0}
+        self._entry = self._index[name]
+
+    def _write_rotated(self, batch):
+        i = 0
+        while i < len(batch):
+            t = batch[i][0]
+            if self._span is None or not self._span[0] <= t < self._span[1]:
+                self._switch_partition(t)
+            j = i + 1
+            while j < len(batch) and self._span[0] <= batch[j][0] < self._span[1]:
+                j += 1
+            self._write_rows(batch[i:j])
+            entry = self._entry
+            entry['first'] = min(entry['first'], t)
+            entry['last'] = max(entry['last'], batch[j - 1][0])
+            entry['rows'] += j - i
+            self._index_dirty = True
+            i = j
+
+    def _save_index(self):
+        if not self._index_dirty:
+            return
+        entries = sorted(self._index.values(), key=lambda entry: entry['span_start'])
+        target = index_path(self.path)
+        tmp = target + '.tmp'
+        try:
+            with open(tmp, 'w') as file:
+                json.dump({'rotate': self.rotate, 'partitions': entries}, file, indent=1)
+            os.replace(tmp, target)     # readers never see a half-written index
+            self._index_dirty = False
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️  Index write error ({target}): {e}")
+
+    def _write_rows(self, batch):
+        if self.timestamped:
+            batch = [[self._timestamp(t)] + list(row) for t, row in batch]
+        self._writer.writerows(batch)
+
+    def _write(self, batch):
+        try:
+            if self.rotate:
+                self._write_rotated(batch)
+            else:
+                self._write_rows(batch)
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1:
+                print(f"⚠️  CSV write error ({self.path}): {e}")
+            return
+        self.rows_written += len(batch)
+        self.batches += 1
+
+    def _flush(self, sync):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1:
+                print(f"⚠️  CSV flush error ({self.path}): {e}")
+        self.flushes += 1
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.batch_interval)
+            self._wake.clear()
+            if self._service():
+                return
+
+    def _service(self):
+        # One writer pass (own thread or SharedWriter): write the queued
+        # rows, flush per policy, close after close(); True once closed.
+        # Flags and waiters first: every row logged before them is
+        # already in the deque and goes into this batch
+        stopping = self._closing
+        waiters = []
+        while self._waiters:
+            waiters.append(self._waiters.popleft())
+        batch = []
+        while self._rows:
+            batch.append(self._rows.popleft())
+        if batch and self.on_full == 'block':
+            with self._room:
+                self._room.notify_all()
+        self.max_backlog = max(self.max_backlog, len(batch))
+
+        if batch:
+            self._write(batch)
+            if not self._pending:
+                self._flush_at = time.monotonic() + self.flush_interval
+            self._pending += len(batch)
+        if self._pending and (stopping or waiters or self._pending >= self.flush_rows
+                              or time.monotonic() >= self._flush_at):
+            self._flush(self.fsync == 'flush')
+            self._save_index()
+            self._pending, self._flush_at = 0, None
+        for done in waiters:
+            done.set()
+        if not stopping:
+            return False
+
+        self._flush(self.fsync != 'never')
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._span = self._entry = None
+        self._save_index()
+        self._closed.set()
+        return True
+
+
+class SharedWriter:
+    """One writer thread serving many CSVLogger(shared=...) instances"""
+
+    def __init__(self, batch_interval=0.05):
+        self.batch_interval = batch_interval
+        self.wake = threading.Event()
+        self._loggers = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+    def add(self, logger):
+        # called by CSVLogger.start(); the thread starts with the first logger
+        with self._lock:
+            self._loggers.append(logger)
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='csv-shared-writer',
+                                                daemon=True)
+                self._thread.start()
+
+    def close(self):
+        """Close every logger still open, then stop the thread"""
+        with self._lock:
+            loggers = list(self._loggers)
+        for logger in loggers:
+            logger.close()
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+        self.wake.set()
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while not self._stopping:
+            self.wake.wait(self.batch_interval)
+            self.wake.clear()
+            with self._lock:
+                loggers = list(self._loggers)
+            for logger in loggers:
+                if logger._service():
+                    with self._lock:
+                        self._loggers.remove(logger)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV logging cost per row")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="rows per second (0: as fast as possible)")
+    parser.add_argument('--fsync', default='close', choices=('never', 'flush', 'close'))
+    args = parser.parse_args()
+    period = 1.0 / args.rate if args.rate else 0.0
+
+    def run(log_row):
+        # seconds spent in log_row() per row, paced at --rate
+        spent = 0.0
+        deadline = time.monotonic()
+        for _ in range(args.rows):
+            t0 = time.perf_counter()
+            log_row()
+            spent += time.perf_counter() - t0
+            if period:
+                deadline += period
+                time.sleep(max(0.0, deadline - time.monotonic()))
+        return spent / args.rows
+
+    header = ['timestamp', 'temperature', 'limit_min', 'limit_max', 'status']
+    row = ['24.81', '20.0', '30.0', 'normal']
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'open_append.csv')
+
+        def open_append():
+            with open(path, 'a', newline='') as file:
+                csv.writer(file).writerow([datetime.now().strftime('%Y-%m-%d %H:%M:%S')] + row)
+        print(f"open/append/close  {run(open_append) * 1e6:8.2f} µs per row in the loop")
+
+        log = CSVLogger(os.path.join(tmp, 'logger.csv'), header=header, mode='w',
+                        timestamp_format='%Y-%m-%d %H:%M:%S', fsync=args.fsync).start()
+        in_loop = run(lambda: log.log(row))
+        log.close()
+        print(f"CSVLogger.log()    {in_loop * 1e6:8.2f} µs per row in the loop "
+              f"({log.batches} batches, {log.flushes} flushes, max backlog {log.max_backlog})")
+
+
+if __name__ == "__main__":
+    main()
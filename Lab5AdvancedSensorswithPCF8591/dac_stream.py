@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: Buffered waveform output on the PCF8591 DAC
+======================================================
+
+Streams a NumPy array or a generator of samples (0-255) to the analog
+output at a target sample rate from a dedicated output thread. Samples are
+sent in blocks: one I2C transaction carries `block_size` DAC values, so the
+per-sample cost is one byte on the bus instead of a full write_byte_data.
+
+Within a block, values are clocked out back to back at bus speed; blocks
+are scheduled on absolute deadlines so the average rate matches the target.
+Larger blocks reach higher rates at the price of coarser timing.
+
+A block that starts more than one block period late is an underrun (the
+DAC held the previous value too long): the source was too slow or the
+thread was delayed. The stream then resynchronises instead of bursting.
+
+Usage:
+    import numpy as np
+    import PCF8591 as ADC
+    from dac_stream import DACStream
+
+    ADC.setup(0x48)
+    t = np.arange(1000) / 1000
+    wave = 128 + 100 * np.sin(2 * np.pi * 5 * t)
+    with DACStream(wave, rate_hz=1000, repeat=True) as stream:
+        time.sleep(10)
+    print(stream.achieved_rate(), stream.underruns)
+
+    python3 dac_stream.py --freq 5 --rate 1000 --seconds 10
+"""
+
+import argparse
+import itertools
+import math
+import threading
+import time
+
+import numpy as np
+
+import PCF8591 as ADC
+
+# Blocks are sized so the output thread wakes up at most this often
+MAX_WAKEUPS_HZ = 500
+
+
+def to_codes(samples):
+    """Clip and round an array of samples to DAC codes (uint8)"""
+    return np.clip(np.rint(np.asarray(samples, dtype=np.float64)), 0, 255).astype(np.uint8)
+
+
+class DACStream:
+    """Output thread pushing samples to the DAC at a target rate"""
+
+    def __init__(self, samples, rate_hz, block_size=None, repeat=False, device=None):
+        self.rate_hz = float(rate_hz)
+        if block_size is None:
+            block_size = max(1, math.ceil(self.rate_hz / MAX_WAKEUPS_HZ))
+        self.block_size = block_size
+        self.repeat = repeat
+        self.device = device    # None: the module default from ADC.setup()
+        self._source = samples
+
+        self.samples_written = 0
+        self.blocks_written = 0
+        self.underruns = 0
+        self.errors = 0
+        self._started_at = None
+        self._finished_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _blocks(self):
+        if isinstance(self._source, np.ndarray):
+            codes = to_codes(self._source)
+            if not len(codes):    # nothing to play (and nothing to repeat)
+                return
+            while True:
+                for i in range(0, len(codes), self.block_size):
+                    yield codes[i:i + self.block_size].tolist()
+                if not self.repeat:
+                    return
+        else:
+            it = iter(self._source)
+            while True:
+                block = [max(0, min(255, int(round(v))))
+                         for v in itertools.islice(it, self.block_size)]
+                if not block:
+                    return
+                yield block
+
+    def _run(self):
+        dev = self.device if self.device is not None else ADC.device
+        self._started_at = time.monotonic()
+        deadline = self._started_at
+        for block in self._blocks():
+            if self._stop.is_set():
+                break
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                if self._stop.wait(delay):
+                    break
+            elif -delay > len(block) / self.rate_hz:
+                self.underruns += 1
+                deadline = time.monotonic()     # resync instead of bursting
+            try:
+                dev.write_block(block)
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"⚠️  DAC write error: {e}")
+            else:
+                self.samples_written += len(block)
+                self.blocks_written += 1
+            deadline += len(block) / self.rate_hz
+        self._finished_at = time.monotonic()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='dac-stream', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.wait()
+
+    def wait(self, timeout=None):
+        """Wait for a finite source to be fully played"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def achieved_rate(self):
+        """Samples per second actually written"""
+        if self._started_at is None:
+            return 0.0
+        end = self._finished_at or time.monotonic()
+        elapsed = end - self._started_at
+        return self.samples_written / elapsed if elapsed > 0 else 0.0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sine test signal on the PCF8591 DAC")
+    parser.add_argument('--freq', type=float, default=5.0, help="sine frequency (Hz)")
+    parser.add_argument('--rate', type=float, default=1000.0, help="DAC sample rate (Hz)")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--block', type=int, default=None, help="samples per transaction")
+    parser.add_argument('--address', type=lambda v: int(v, 0), default=0x48)
+    args = parser.parse_args()
+
+    ADC.setup(args.address)
+    n = int(args.rate * args.seconds)
+    t = np.arange(n) / args.rate
+    wave = 128 + 127 * np.sin(2 * np.pi * args.freq * t)
+
+    print(f"🔊 Sine {args.freq} Hz on AOUT at {args.rate:.0f} samples/s for {args.seconds} s")
+    stream = DACStream(wave, rate_hz=args.rate, block_size=args.block).start()
+    try:
+        stream.wait()
+    except KeyboardInterrupt:
+        stream.stop()
+    finally:
+        ADC.write(0)
+    print(f"✅ {stream.samples_written} samples, {stream.achieved_rate():.1f} samples/s, "
+          f"{stream.blocks_written} transactions, {stream.underruns} underruns")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,9 @@ import RPi.GPIO as GPIO
 import time
 import math
 import datetime
+from thermistor_model import DEFAULT as thermistor
+from joystick import Joystick
+from csv_logger import CSVLogger
 import sys
 
 # GPIO Setup
@@ -27,7 +30,16 @@ GPIO.setup(DHT_PIN, GPIO.IN)
 
 # Global variables
 running = True
-log_file = f"sensor_log_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+# One file per day (sensor_log_YYYY-MM-DD.csv), appended across runs, with a
+# time-range index in sensor_log.csv.index.json
+log_file = "sensor_log.csv"
+logger = CSVLogger(log_file, rotate='day', timestamp_format='%Y-%m-%dT%H:%M:%S',
+                   header=['timestamp', 'temperature_dht', 'humidity', 'light_level',
+                           'sound_level', 'temperature_thermistor', 'joystick_state'])
+# polled once per display cycle (2 s): a single frame is enough to register
+joystick = Joystick(debounce=1)
+JOYSTICK_NAMES = {'home': "CENTER", 'up': "UP", 'down': "DOWN",
+                  'left': "LEFT", 'right': "RIGHT", 'pressed': "PRESSED"}
 
 def setup():
     """Initialize all sensors"""
@@ -37,11 +49,13 @@ def setup():
     try:
         ADC.setup(0x48)
         print("✅ PCF8591 ADC/DAC initialized successfully")
+
+        # Joystick rest position (leave the stick untouched)
+        joystick.calibrate()
         
-        # Create CSV log file header
-        with open(log_file, 'w') as f:
-            f.write("timestamp,temperature_dht,humidity,light_level,sound_level,temperature_thermistor,joystick_state\n")
-        print(f"✅ Data logging initialized: {log_file}")
+        # Create CSV log file header, start the background writer
+        logger.start()
+        print("✅ Data logging initialized: sensor_log_<date>.csv (daily files)")
         
         return True
     except Exception as e:
@@ -74,14 +88,9 @@ def read_sound_sensor():
 def read_thermistor():
     """Read temperature from thermistor"""
     try:
-        analog_val = ADC.read(2)
-        if analog_val == 0:
-            return 0
-        
-        vr = 5 * float(analog_val) / 255
-        rt = 10000 * vr / (5 - vr)
-        temp = 1/(((math.log(rt / 10000)) / 3950) + (1 / (273.15+25)))
-        temp = temp - 273.15
+        temp = thermistor.to_celsius(ADC.read(2))
+        if math.isnan(temp):
+            return 0    # sensor at a rail (shorted or disconnected)
         return round(temp, 2)
     except:
         return 0
@@ -89,23 +98,9 @@ def read_thermistor():
 def read_joystick():
     """Read joystick position"""
     try:
-        x_val = ADC.read(0)
-        y_val = ADC.read(1)
-        btn_val = ADC.read(2)
-        
-        # Determine direction
-        if x_val <= 30:
-            return "UP"
-        elif x_val >= 225:
-            return "DOWN"
-        elif y_val >= 225:
-            return "LEFT"
-        elif y_val <= 30:
-            return "RIGHT"
-        elif btn_val <= 30:
-            return "PRESSED"
-        else:
-            return "CENTER"
+        # One snapshot of channels 0-2, through the debounced state machine
+        joystick.update(joystick.read_frame())
+        return JOYSTICK_NAMES[joystick.state]
     except:
         return "ERROR"
 
@@ -143,9 +138,8 @@ def display_sensor_data(temp_dht, humidity, light, sound, temp_therm, joystick):
 def log_data(temp_dht, humidity, light, sound, temp_therm, joystick):
     """Log sensor data to CSV file"""
     try:
-        timestamp = datetime.datetime.now().isoformat()
-        with open(log_file, 'a') as f:
-            f.write(f"{timestamp},{temp_dht},{humidity},{light},{sound},{temp_therm},{joystick}\n")
+        # Queued: the writer thread adds the timestamp and writes in batches
+        logger.log([temp_dht, humidity, light, sound, temp_therm, joystick])
     except Exception as e:
         print(f"⚠️  Logging error: {e}")
 
@@ -192,9 +186,10 @@ def main_loop():
 def cleanup():
     """Clean up resources"""
     try:
+        logger.close()
         GPIO.cleanup()
         print("✅ GPIO cleanup completed")
-        print(f"📁 Data saved to: {log_file}")
+        print("📁 Data saved to: sensor_log_<date>.csv (index: sensor_log.csv.index.json)")
         print("👋 Thank you for using IoT Lab 5!")
     except:
         pass
@@ -9,40 +9,134 @@
 #
 #------------------------------------------------------
 import PCF8591 as ADC 
+import collections
 import time
 
+# kind is 'change' (new debounced direction) or 'repeat' (direction held)
+Event = collections.namedtuple('Event', 'kind direction time')
+
+# (frame index, sign) of the deflection that defines each direction
+_AXES = {'up': (0, -1), 'down': (0, 1), 'left': (1, 1), 'right': (1, -1)}
+
+class Joystick:
+	# Classifies one (vertical, horizontal, button) snapshot per poll, read
+	# with a single read_channels() transaction. Thresholds are deflections
+	# from the calibrated rest position: a direction is entered beyond
+	# `threshold` and only left again below `release` (hysteresis), and a new
+	# direction must be seen on `debounce` consecutive polls before it is
+	# reported. Directions listed in `repeat` emit 'repeat' events while held.
+	def __init__(self, vertical=0, horizontal=1, button=2, threshold=95, release=70,
+			button_press=30, button_release=60, debounce=2,
+			repeat_delay=0.5, repeat_interval=0.5, repeat=('up', 'down', 'left', 'right'),
+			device=None):
+		self.channels = [vertical, horizontal, button]
+		self.center = [128, 128]
+		self.threshold = threshold
+		self.release = release
+		self.button_press = button_press
+		self.button_release = button_release
+		self.debounce = debounce
+		self.repeat_delay = repeat_delay
+		self.repeat_interval = repeat_interval
+		self.repeat = tuple(repeat)
+		self.device = device	# None: the module default from ADC.setup()
+
+		self.state = 'home'		# debounced direction
+		self.last_frame = None
+		self._raw = 'home'		# classification of the last frame
+		self._candidate = 'home'
+		self._seen = 0
+		self._next_repeat = None
+
+	def read_frame(self):
+		dev = self.device if self.device is not None else ADC.device
+		return dev.read_channels(self.channels)
+
+	def calibrate(self, frames=16, interval=0.01):
+		# Take the rest position as center: leave the stick untouched. A
+		# reading further than `release` from mid-scale cannot be the rest
+		# position (stick held at startup): keep the previous center.
+		samples = []
+		for _ in range(frames):
+			samples.append(self.read_frame())
+			time.sleep(interval)
+		center = [sorted(s[i] for s in samples)[frames // 2] for i in (0, 1)]
+		if all(abs(c - 128) < self.release for c in center):
+			self.center = center
+		else:
+			print ("Joystick not at rest (%d, %d), keeping center %s" % (center[0], center[1], self.center))
+		return self.center
+
+	def classify(self, frame, previous='home'):
+		# Direction of one frame; `previous` enables the release hysteresis
+		btn = frame[2]
+		if btn <= self.button_press or (previous == 'pressed' and btn <= self.button_release):
+			return 'pressed'
+		deflection = (frame[0] - self.center[0], frame[1] - self.center[1])
+		if previous in _AXES:
+			axis, sign = _AXES[previous]
+			if deflection[axis] * sign >= self.release:
+				return previous
+		dv, dh = deflection
+		if max(abs(dv), abs(dh)) < self.threshold:
+			return 'home'
+		if abs(dv) >= abs(dh):
+			return 'up' if dv < 0 else 'down'
+		return 'left' if dh > 0 else 'right'
+
+	def update(self, frame, now=None):
+		# Feed one frame; returns an Event or None
+		if now is None:
+			now = time.monotonic()
+		self.last_frame = frame
+		self._raw = self.classify(frame, self._raw)
+		if self._raw != self.state:
+			if self._raw == self._candidate:
+				self._seen += 1
+			else:
+				self._candidate, self._seen = self._raw, 1
+			if self._seen < self.debounce:
+				return None
+			self.state = self._raw
+			self._next_repeat = now + self.repeat_delay if self.state in self.repeat else None
+			return Event('change', self.state, now)
+		self._candidate, self._seen = self.state, 0
+		if self._next_repeat is not None and now >= self._next_repeat:
+			self._next_repeat = max(self._next_repeat + self.repeat_interval, now)
+			return Event('repeat', self.state, now)
+		return None
+
+	def poll(self):
+		return self.update(self.read_frame())
+
+	def events(self, rate_hz=50.0):
+		# Poll at a fixed rate, yield only when something happens
+		period = 1.0 / rate_hz
+		deadline = time.monotonic()
+		while True:
+			event = self.poll()
+			if event is not None:
+				yield event
+			deadline += period
+			delay = deadline - time.monotonic()
+			if delay > 0:
+				time.sleep(delay)
+			else:
+				deadline = time.monotonic()
+
+joystick = Joystick(repeat=())
+
 def setup():
 	ADC.setup(0x48)					# Setup PCF8591
-	global state
+	joystick.calibrate()			# stick must be at rest
 
 def direction():	#get joystick result
-	state = ['home', 'up', 'down', 'left', 'right', 'pressed']
-	i = 0
-	if ADC.read(0) <= 30:
-		i = 1		#up
-	if ADC.read(0) >= 225:
-		i = 2		#down
-
-	if ADC.read(1) >= 225:
-		i = 3		#left
-	if ADC.read(1) <= 30:
-		i = 4		#right
-
-	if ADC.read(2) <= 30:
-		i = 5		# Button pressed
-
-	if ADC.read(0) - 125 < 15 and ADC.read(0) - 125 > -15	and ADC.read(1) - 125 < 15 and ADC.read(1) - 125 > -15 and ADC.read(2) == 255:
-		i = 0
-	
-	return state[i]
+	# one bus frame (all three channels) per classification
+	return joystick.classify(joystick.read_frame())
 
 def loop():
-	status = ''
-	while True:
-		tmp = direction()
-		if tmp != None and tmp != status:
-			print (tmp)
-			status = tmp
+	for event in joystick.events():
+		print (event.direction)
 
 def destroy():
 	pass
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: In-memory PCF8591 emulator
+=====================================
+
+A software model of the PCF8591 that plugs into PCF8591.py as a bus
+backend, so the ADC code paths can be run and benchmarked without a
+Raspberry Pi.
+
+Modelled behaviour:
+- Control register (channel select, auto-increment, analog output enable)
+- Previous-conversion latch: each byte read returns the last conversion
+  and starts a new one on the currently selected channel
+- Auto-increment: the channel advances after every conversion (3 -> 0)
+- DAC register: bytes written after the control byte
+- Fixed per-transaction latency (seconds), to mimic a 100 kHz bus
+
+Only the four single-ended input mode is modelled.
+
+Channel signals are scriptable: a number, a callable f(t) where t is the
+time in seconds since the device was created, or an iterable (the last
+value is held once it is exhausted).
+
+Usage:
+    import PCF8591 as ADC
+    import pcf8591_sim
+
+    sim = pcf8591_sim.SimBus(latency=0.0003)
+    sim.device(0x48).set_signal(3, lambda t: 128 + 20 * math.sin(t))
+    ADC.use_backend(sim)
+    ADC.setup(0x48)
+"""
+
+import threading
+import time
+
+POWER_ON_LATCH = 0x80
+CHANNEL_MASK = 0x03
+AUTO_INCREMENT = 0x04
+
+# Defaults wire up the Lab 5/6 boards: joystick centred on 0/1,
+# button released on 2, thermistor at ~25°C on 3.
+DEFAULT_SIGNALS = (128, 128, 255, 128)
+
+
+class SimPCF8591:
+    """Register-level model of one PCF8591 chip"""
+
+    def __init__(self, signals=DEFAULT_SIGNALS):
+        self.control = 0
+        self.latch = POWER_ON_LATCH
+        self.dac = 0
+        self.dac_writes = 0
+        self._t0 = time.monotonic()
+        self._signals = [None] * 4
+        self._held = [0] * 4
+        for chn, signal in enumerate(signals):
+            self.set_signal(chn, signal)
+
+    def set_signal(self, chn, signal):
+        """Script channel `chn`: number, callable f(t) or iterable"""
+        if not callable(signal) and not isinstance(signal, (int, float)):
+            signal = iter(signal)
+        self._signals[chn] = signal
+
+    def _sample(self, chn):
+        signal = self._signals[chn]
+        if isinstance(signal, (int, float)):
+            value = signal
+        elif callable(signal):
+            value = signal(time.monotonic() - self._t0)
+        else:
+            value = next(signal, self._held[chn])
+        value = max(0, min(255, int(round(value))))
+        self._held[chn] = value
+        return value
+
+    def write(self, data):
+        """Master write: control byte, then DAC bytes"""
+        if not data:
+            return
+        self.control = data[0]
+        for value in data[1:]:
+            self.dac = value & 0xFF
+            self.dac_writes += 1
+
+    def read(self, length):
+        """Master read: each byte is the previous conversion result"""
+        out = []
+        for _ in range(length):
+            out.append(self.latch)
+            chn = self.control & CHANNEL_MASK
+            self.latch = self._sample(chn)
+            if self.control & AUTO_INCREMENT:
+                self.control = (self.control & ~CHANNEL_MASK) | ((chn + 1) & CHANNEL_MASK)
+        return out
+
+
+class SimBus:
+    """Bus backend for PCF8591.use_backend() backed by SimPCF8591 devices"""
+
+    def __init__(self, devices=None, latency=0.0):
+        if devices is None:
+            devices = {0x48: SimPCF8591()}
+        self.devices = dict(devices)
+        self.latency = latency
+        self.transactions = 0
+        self._lock = threading.Lock()
+
+    def device(self, addr):
+        return self.devices[addr]
+
+    def _begin(self, addr):
+        # caller holds self._lock
+        self.transactions += 1
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            return self.devices[addr]
+        except KeyError:
+            raise OSError(121, "Remote I/O error (no device at 0x%02X)" % addr)
+
+    def write_byte(self, addr, val):
+        with self._lock:
+            self._begin(addr).write([val & 0xFF])
+
+    def read_byte(self, addr):
+        with self._lock:
+            return self._begin(addr).read(1)[0]
+
+    def write_byte_data(self, addr, reg, val):
+        with self._lock:
+            self._begin(addr).write([reg & 0xFF, val & 0xFF])
+
+    def write_bytes(self, addr, data):
+        with self._lock:
+            self._begin(addr).write([value & 0xFF for value in data])
+
+    def write_read(self, addr, data, length):
+        with self._lock:
+            dev = self._begin(addr)
+            dev.write(list(data))
+            return dev.read(length)
+
+    def close(self):
+        pass
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: Background ADC sampler
+=================================
+
+Reads a set of PCF8591 channels at a fixed rate in a background thread and
+stores timestamped samples in preallocated NumPy ring buffers, so the
+application reads from memory instead of polling the bus.
+
+Each ring is stored twice back to back (mirrored), so the latest N samples
+are always one contiguous slice: latest() returns a zero-copy, read-only
+view. Views are live memory - copy them if you keep them longer than it
+takes the sampler to overwrite them (capacity - N samples).
+
+Usage:
+    import PCF8591 as ADC
+    from sampler import Sampler
+
+    ADC.setup(0x48)
+    sampler = Sampler([0, 3], rate_hz=200)
+    sampler.start()
+    last = sampler.latest(3, 50)        # view of the last 50 codes
+    stats = sampler.aggregate(3, 1.0)   # mean/min/max/std over 1 second
+    sampler.stop()
+"""
+
+import threading
+import time
+
+import numpy as np
+
+import PCF8591 as ADC
+
+
+class RingBuffer:
+    """Fixed-capacity ring of (timestamp, value) pairs with contiguous views"""
+
+    def __init__(self, capacity, dtype=np.uint8):
+        self.capacity = capacity
+        self.count = 0      # total samples ever written
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        self._values = np.zeros(2 * capacity, dtype=dtype)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, value):
+        i = self.count % self.capacity
+        j = i + self.capacity
+        self._times[i] = self._times[j] = timestamp
+        self._values[i] = self._values[j] = value
+        self.count += 1     # publish after the data is in place
+
+    def _slice(self, n):
+        n = max(0, min(n, len(self)))
+        end = self.count % self.capacity + self.capacity
+        return slice(end - n, end)
+
+    @staticmethod
+    def _readonly(view):
+        view.flags.writeable = False
+        return view
+
+    def latest(self, n):
+        """View of the last n values, oldest first"""
+        return self._readonly(self._values[self._slice(n)])
+
+    def latest_times(self, n):
+        """View of the timestamps matching latest(n)"""
+        return self._readonly(self._times[self._slice(n)])
+
+    def since(self, t0):
+        """(times, values) views of every sample with timestamp >= t0"""
+        s = self._slice(self.capacity)
+        times = self._times[s]
+        start = s.start + int(np.searchsorted(times, t0, side='left'))
+        s = slice(start, s.stop)
+        return self._readonly(self._times[s]), self._readonly(self._values[s])
+
+
+class Sampler:
+    """Background thread sampling ADC channels into ring buffers"""
+
+    def __init__(self, channels, rate_hz=100.0, capacity=4096, read_frame=None,
+                 device=None):
+        self.channels = list(channels)
+        self.device = device    # None: the module default from ADC.setup()
+        self.rate_hz = rate_hz
+        self.buffers = {chn: RingBuffer(capacity) for chn in self.channels}
+        if read_frame is None:
+            read_frame = self._read_frame
+        self._read = read_frame
+
+        self.frames = 0
+        self.overruns = 0   # frames that started after their deadline
+        self.errors = 0
+        self._started_at = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def _read_frame(self):
+        dev = self.device if self.device is not None else ADC.device
+        if len(self.channels) == 1:
+            # single channel: read() honours pipelined mode
+            return [dev.read(self.channels[0])]
+        return dev.read_channels(self.channels)
+
+    def start(self, wait=1.0):
+        """Start sampling; wait up to `wait` seconds for the first frame"""
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='adc-sampler', daemon=True)
+        self._thread.start()
+        if wait:
+            self._ready.wait(wait)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        self._started_at = time.monotonic()
+        deadline = self._started_at
+        while not self._stop.is_set():
+            try:
+                values = self._read()
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"⚠️  Sampler read error: {e}")
+            else:
+                now = time.time()
+                for chn, value in zip(self.channels, values):
+                    self.buffers[chn].append(now, value)
+                self.frames += 1
+                self._ready.set()
+
+            deadline += period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                self.overruns += 1
+                if -delay > period:
+                    deadline = time.monotonic()     # too far behind: resync
+
+    def achieved_rate(self):
+        """Frames per second since start()"""
+        if self._started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def value(self, chn):
+        """Most recent sample of a channel (None before the first frame)"""
+        buf = self.buffers[chn]
+        if not len(buf):
+            return None
+        return int(buf.latest(1)[0])
+
+    def frame(self, chns=None):
+        """Most recent sample of several channels"""
+        return [self.value(chn) for chn in (chns or self.channels)]
+
+    def latest(self, chn, n):
+        """Zero-copy view of the last n samples of a channel"""
+        return self.buffers[chn].latest(n)
+
+    def latest_times(self, chn, n):
+        return self.buffers[chn].latest_times(n)
+
+    def window(self, chn, seconds):
+        """(times, values) views of the samples taken in the last `seconds`"""
+        return self.buffers[chn].since(time.time() - seconds)
+
+    def aggregate(self, chn, seconds):
+        """count/mean/min/max/std of a channel over the last `seconds`"""
+        _, values = self.window(chn, seconds)
+        if not len(values):
+            return {'count': 0, 'mean': None, 'min': None, 'max': None, 'std': None}
+        return {
+            'count': int(len(values)),
+            'mean': float(values.mean()),
+            'min': int(values.min()),
+            'max': int(values.max()),
+            'std': float(values.std()),
+        }
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: Run a lab script against the PCF8591 emulator
+========================================================
+
+Runs any script that does `import PCF8591 as ADC` (thermistor.py,
+joystick.py, demo.py, the Lab 6 monitor, ...) unchanged on a plain Linux
+box: the driver is switched to the in-memory SimBus and, when RPi.GPIO is
+not installed, a minimal GPIO stand-in is provided so the scripts import.
+
+Usage:
+    python3 sim_run.py [--latency S] [--signal CH=VALUE ...]
+                       [--synthetic SEED [--layout lab6|lab5]] script.py [args...]
+
+Example:
+    python3 sim_run.py --signal 3=90 ../Lab6IntelligentTemperatureHumiditySystem/code/temperature_system_final.py
+    python3 sim_run.py --address 0x48 --address 0x49 ../Lab6IntelligentTemperatureHumiditySystem/code/monitor.py \
+        --sensor a=0x48:3 --sensor b=0x49:0
+    python3 sim_run.py --synthetic 1 ../Lab6IntelligentTemperatureHumiditySystem/code/temperature_system_final.py
+"""
+
+import argparse
+import os
+import runpy
+import sys
+import types
+
+import PCF8591 as ADC
+import pcf8591_sim
+from synthetic import Synthetic
+
+
+def make_gpio_module():
+    """Minimal RPi.GPIO stand-in: inputs read HIGH, outputs are recorded"""
+    gpio = types.ModuleType('RPi.GPIO')
+    gpio.BOARD, gpio.BCM = 10, 11
+    gpio.OUT, gpio.IN = 0, 1
+    gpio.LOW, gpio.HIGH = 0, 1
+    gpio.PUD_OFF, gpio.PUD_DOWN, gpio.PUD_UP = 20, 21, 22
+    gpio.RISING, gpio.FALLING, gpio.BOTH = 31, 32, 33
+    gpio.levels = {}
+
+    gpio.setmode = lambda mode: None
+    gpio.setwarnings = lambda flag: None
+    gpio.setup = lambda pin, mode, *args, **kwargs: None
+    gpio.input = lambda pin: gpio.levels.get(pin, gpio.HIGH)
+    gpio.output = lambda pin, value: gpio.levels.__setitem__(pin, value)
+    gpio.add_event_detect = lambda pin, edge, *args, **kwargs: None
+    gpio.remove_event_detect = lambda pin: None
+    gpio.cleanup = lambda *args: None
+
+    class PWM:
+        def __init__(self, pin, freq):
+            self.pin, self.freq = pin, freq
+
+        def start(self, duty):
+            pass
+
+        def ChangeDutyCycle(self, duty):
+            pass
+
+        def ChangeFrequency(self, freq):
+            self.freq = freq
+
+        def stop(self):
+            pass
+
+    gpio.PWM = PWM
+    return gpio
+
+
+def install_gpio():
+    try:
+        import RPi.GPIO  # noqa: F401
+    except (ImportError, RuntimeError):
+        gpio = make_gpio_module()
+        rpi = types.ModuleType('RPi')
+        rpi.GPIO = gpio
+        sys.modules['RPi'] = rpi
+        sys.modules['RPi.GPIO'] = gpio
+
+
+def parse_signal(text):
+    chn, value = text.split('=', 1)
+    return int(chn), float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a lab script on the PCF8591 emulator")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="per-transaction bus latency in seconds")
+    parser.add_argument('--address', type=lambda v: int(v, 0), action='append',
+                        help="emulated board address (repeat for several boards, default 0x48)")
+    parser.add_argument('--signal', type=parse_signal, action='append', default=[],
+                        metavar='CH=VALUE', help="constant ADC code for a channel")
+    parser.add_argument('--synthetic', type=int, metavar='SEED',
+                        help="drive the channels with the seeded synthetic load (synthetic.py)")
+    parser.add_argument('--layout', choices=('lab6', 'lab5'), default='lab6',
+                        help="channel wiring of the synthetic load")
+    parser.add_argument('--rate', type=float, default=50.0,
+                        help="synthetic sample rate in Hz")
+    parser.add_argument('script')
+    parser.add_argument('args', nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    devices = {}
+    for address in args.address or [0x48]:
+        devices[address] = pcf8591_sim.SimPCF8591()
+        if args.synthetic is not None:
+            # one seed per board, so each board gets its own reproducible load
+            synth = Synthetic(seed=args.synthetic + address - 0x48, rate_hz=args.rate)
+            for chn, signal in synth.signals(args.layout).items():
+                devices[address].set_signal(chn, signal)
+        for chn, value in args.signal:
+            devices[address].set_signal(chn, value)
+    ADC.use_backend(pcf8591_sim.SimBus(devices, latency=args.latency))
+    install_gpio()
+
+    script = os.path.abspath(args.script)
+    sys.argv = [script] + args.args
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name='__main__')
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,23 @@
 import PCF8591 as ADC
 import RPi.GPIO as GPIO
 import time
+from sampler import Sampler
 
 GPIO.setmode(GPIO.BCM)
 
+# AIN0 is sampled at 200 Hz in the background, so short sounds between
+# two prints are not missed
+sampler = Sampler([0], rate_hz=200)
+
 def setup():
 	ADC.setup(0x48)
+	ADC.set_pipelined(True)	# single-channel stream: 1 transaction per read
+	sampler.start()
 
 def loop():
 	count = 0
 	while True:
-		voiceValue = ADC.read(0)
+		voiceValue = sampler.aggregate(0, 0.2)['min']	# loudest = lowest value
 		if voiceValue:
 			print ("Value:", voiceValue)
 			if voiceValue < 50:
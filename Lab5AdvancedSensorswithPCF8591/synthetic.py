@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: Deterministic synthetic sensor load
+==============================================
+
+Seeded generator of realistic sensor streams, to stress the monitors, the
+loggers and the analysis scripts without hardware:
+
+    thermistor   daily cycle + slow drift (mean-reverting, ~6 h) +
+                 Gaussian noise, occasional spikes, and dropouts (a few
+                 samples at the rail, as with a loose wire)
+    ambient      DHT11 temperature/humidity, day/night light level,
+                 background sound with bursts (Lab 5 demo)
+    joystick     random holds (direction, 0.2-2 s), which also move the
+                 Lab 6 limits exactly as the monitor's joystick events do
+
+The same seed gives the same data whatever the chunk sizes: every
+component draws from its own random stream.
+
+Two ways to plug it in:
+
+    * where the hardware is read: signals() gives the emulator one f(t)
+      per channel, so any lab script runs on synthetic data in real time
+      (sim_run.py --synthetic SEED)
+    * rows: write_csv() produces the exact CSV schemas of the Lab 6 monitor
+      (results_equipe_xx.csv) and of demo.py (sensor_log.csv), as fast as
+      possible (millions of rows) or paced in real time through CSVLogger
+
+Usage:
+    python3 synthetic.py lab6 results_synth.csv --rows 2000000 --seed 1
+    python3 synthetic.py lab5 sensor_synth.csv --rows 1000000
+    python3 synthetic.py lab6 live.csv --rows 600 --rate 50 --realtime
+
+    from synthetic import Synthetic
+    synth = Synthetic(seed=1, rate_hz=0.5)
+    chunk = synth.generate(100000)       # dict of NumPy arrays
+"""
+
+import argparse
+import csv
+import math
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from thermistor_model import DEFAULT as DEFAULT_MODEL
+
+LAB6_HEADER = ['timestamp', 'temperature', 'limit_min', 'limit_max',
+               'status', 'violations_min', 'violations_max']
+LAB5_HEADER = ['timestamp', 'temperature_dht', 'humidity', 'light_level',
+               'sound_level', 'temperature_thermistor', 'joystick_state']
+SCHEMAS = {
+    # header, timestamp format, date/time separator, default rate (loop period)
+    'lab6': (LAB6_HEADER, '%Y-%m-%d %H:%M:%S', ' ', 0.5),
+    'lab5': (LAB5_HEADER, '%Y-%m-%dT%H:%M:%S', 'T', 0.5),
+}
+DEFAULT_START = '2025-01-06T00:00:00'
+
+DIRECTIONS = ('up', 'down', 'left', 'right', 'pressed')
+JOYSTICK_NAMES = {'home': "CENTER", 'up': "UP", 'down': "DOWN",
+                  'left': "LEFT", 'right': "RIGHT", 'pressed': "PRESSED"}
+# (vertical, horizontal, button) codes of a held direction (button pulled up)
+JOYSTICK_FRAMES = {'home': (128, 128, 255), 'up': (0, 128, 255), 'down': (255, 128, 255),
+                   'left': (128, 255, 255), 'right': (128, 0, 255), 'pressed': (128, 128, 0)}
+
+DRIFT_STEP = 60.0           # seconds between drift knots
+REPEAT_DELAY = 0.5          # Lab 6 joystick: first repeat, then every 0.5 s
+REPEAT_INTERVAL = 0.5
+
+
+class Synthetic:
+    """Seeded sensor streams, sample i at start + i / rate_hz"""
+
+    def __init__(self, seed=0, rate_hz=0.5, start=None, base=24.0, daily=3.0,
+                 drift=2.0, drift_tau=6 * 3600.0, noise=0.3, spike_rate=1e-3,
+                 spike_size=8.0, dropout_rate=2e-4, dropout_len=5,
+                 joystick_interval=600.0, temp_min=20.0, temp_max=30.0,
+                 model=DEFAULT_MODEL):
+        self.seed = seed
+        self.rate_hz = rate_hz
+        self.start = time.time() if start is None else start
+        self.base = base
+        self.daily = daily
+        self.drift = drift
+        self.drift_tau = drift_tau
+        self.noise = noise
+        self.spike_rate = spike_rate
+        self.spike_size = spike_size
+        self.dropout_rate = dropout_rate
+        self.dropout_len = dropout_len
+        self.joystick_interval = joystick_interval
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        self.model = model
+        self.index = 0              # next sample
+
+        names = ('drift', 'noise', 'spikes', 'dropouts', 'joystick', 'ambient')
+        streams = np.random.SeedSequence(seed).spawn(len(names))
+        self._rng = {name: np.random.default_rng(s) for name, s in zip(names, streams)}
+        self._knots = [0.0]         # drift every DRIFT_STEP s from start
+        self._dropout_left = 0
+        self._holds = []            # (start, end, direction), seconds from start
+        self._next_hold = self._rng['joystick'].exponential(joystick_interval)
+        self._limits = [temp_min, temp_max]     # after the last limit change
+        self._row_limits = (temp_min, temp_max) # in effect at the next row
+        self._limit_changes = []    # (time, min, max) not yet reached by rows
+        self._violations = [0, 0]
+
+        # inverse of the thermistor table (temperature falls as the code rises)
+        codes = np.arange(1, 255, dtype=np.float64)
+        temps = model.convert(codes)
+        self._inv_temps = temps[::-1]
+        self._inv_codes = codes[::-1]
+
+    # -- streams ---------------------------------------------------------
+
+    def _drift(self, tt):
+        # mean-reverting random walk on knots, linearly interpolated
+        needed = int(tt[-1] // DRIFT_STEP) + 2
+        if needed > len(self._knots):
+            a = math.exp(-DRIFT_STEP / self.drift_tau)
+            steps = self._rng['drift'].standard_normal(needed - len(self._knots))
+            sigma = self.drift * math.sqrt(1 - a * a)
+            x = self._knots[-1]
+            for e in steps:
+                x = a * x + sigma * e
+                self._knots.append(x)
+        knots = np.asarray(self._knots[:needed])
+        return np.interp(tt, np.arange(needed) * DRIFT_STEP, knots)
+
+    def _dropouts(self, n):
+        mask = np.zeros(n, dtype=bool)
+        carry = min(self._dropout_left, n)
+        mask[:carry] = True
+        self._dropout_left -= carry
+        for i in np.flatnonzero(self._rng['dropouts'].random(n) < self.dropout_rate):
+            mask[i:i + self.dropout_len] = True
+            self._dropout_left = max(self._dropout_left, i + self.dropout_len - n)
+        return mask
+
+    def _extend_holds(self, until):
+        # half of the holds steer the limits back towards their initial
+        # values, as a user would, so they stay bounded over long runs
+        rng = self._rng['joystick']
+        while self._next_hold <= until:
+            begin = self._next_hold
+            end = begin + 0.2 + 1.8 * rng.random()
+            steer = rng.random() < 0.5
+            direction = DIRECTIONS[int(rng.integers(len(DIRECTIONS)))]
+            lo, hi = self._limits
+            if steer and hi != self.temp_max:
+                direction = 'down' if hi > self.temp_max else 'up'
+            elif steer and lo != self.temp_min:
+                direction = 'left' if lo > self.temp_min else 'right'
+            self._holds.append((begin, end, direction))
+            self._adjust(begin, end, direction)
+            self._next_hold = end + rng.exponential(self.joystick_interval)
+
+    def joystick_at(self, tt):
+        """Held direction ('home' between holds) at times tt (s from start)"""
+        tt = np.asarray(tt, dtype=np.float64)
+        self._extend_holds(float(tt.max()) if tt.size else 0.0)
+        if not self._holds:
+            return np.full(tt.shape, 'home')
+        starts, ends, directions = (np.array(column) for column in zip(*self._holds))
+        k = np.searchsorted(starts, tt, side='right') - 1
+        held = (k >= 0) & (tt < ends[np.maximum(k, 0)])
+        return np.where(held, directions[np.maximum(k, 0)], 'home')
+
+    def _adjust(self, begin, end, direction):
+        # limit changes of one hold, like SensorMonitor.adjust() with the
+        # Lab 6 joystick repeat (first event, then every 0.5 s after 0.5 s)
+        if direction == 'pressed':
+            return
+        lo, hi = self._limits
+        held = end - begin
+        events = 1 + (int((held - REPEAT_DELAY) / REPEAT_INTERVAL) + 1
+                      if held >= REPEAT_DELAY else 0)
+        for k in range(events):
+            if direction == 'up':
+                hi += 1.0
+            elif direction == 'down':
+                hi = max(hi - 1.0, lo + 1.0)
+            elif direction == 'right':
+                lo = min(lo + 1.0, hi - 1.0)
+            else:
+                lo -= 1.0
+            t = begin + (0.0 if k == 0 else REPEAT_DELAY + (k - 1) * REPEAT_INTERVAL)
+            self._limit_changes.append((t, lo, hi))
+        self._limits = [lo, hi]
+
+    def generate(self, n):
+        """Next n samples: dict of arrays (t, temperature, code, dropout, ...)"""
+        idx = np.arange(self.index, self.index + n, dtype=np.float64)
+        self.index += n
+        tt = idx / self.rate_hz                     # seconds from start
+        t = self.start + tt
+
+        smooth = (self.base + self.daily * np.sin(2 * np.pi * (t % 86400 - 9 * 3600) / 86400)
+                  + self._drift(tt))
+        temperature = smooth + self.noise * self._rng['noise'].standard_normal(n)
+        u = self._rng['spikes'].random((n, 2))
+        spikes = u[:, 0] < self.spike_rate
+        sign = np.where(u[:, 1] < 0.5, -1.0, 1.0)
+        temperature[spikes] += sign[spikes] * self.spike_size * (0.5 + (2 * u[spikes, 1]) % 1.0)
+        dropout = self._dropouts(n)
+
+        code = np.interp(temperature, self._inv_temps, self._inv_codes)
+        code[dropout] = 0.0                         # rail: sensor disconnected
+        temperature[dropout] = np.nan
+
+        a = self._rng['ambient'].random((n, 3))
+        daylight = np.clip(np.sin(2 * np.pi * (t % 86400 - 6 * 3600) / 86400), 0.0, None)
+        light = np.clip(np.rint(20 + 200 * daylight + 20 * (a[:, 0] - 0.5)), 0, 255)
+        burst = a[:, 2] < 0.02
+        sound = 12 + 16 * a[:, 1] + burst * (100 + 100 * a[:, 1])
+        humidity = np.clip(np.rint(55 - 1.5 * (smooth - self.base) + 4 * (a[:, 0] - 0.5)), 20, 90)
+
+        return {
+            't': t, 'temperature': temperature, 'code': code, 'dropout': dropout,
+            'spike': spikes, 'smooth': smooth, 'light': light.astype(np.int64),
+            'sound': np.clip(np.rint(sound), 0, 255).astype(np.int64),
+            'humidity': humidity, 'joystick': self.joystick_at(tt),
+        }
+
+    # -- rows ------------------------------------------------------------
+
+    def lab6_columns(self, n):
+        """Columns of the Lab 6 monitor's CSV for the next n samples
+
+        Samples lost to a dropout produce no row, as in the monitor.
+        """
+        chunk = self.generate(n)
+        tt = chunk['t'] - self.start
+        self._extend_holds(float(tt[-1]))
+        keep = ~chunk['dropout']
+        t, temp = chunk['t'][keep], chunk['temperature'][keep]
+        tt = tt[keep]
+
+        lo = np.full(len(t), self._row_limits[0])
+        hi = np.full(len(t), self._row_limits[1])
+        until = float(chunk['t'][-1] - self.start)
+        pending = []
+        for change in self._limit_changes:
+            after = tt >= change[0]
+            lo[after] = change[1]
+            hi[after] = change[2]
+            if change[0] <= until:
+                self._row_limits = change[1:]
+            else:
+                pending.append(change)
+        self._limit_changes = pending
+
+        low = temp < lo
+        high = temp > hi
+        vmin = self._violations[0] + np.cumsum(low)
+        vmax = self._violations[1] + np.cumsum(high)
+        if len(t):
+            self._violations = [int(vmin[-1]), int(vmax[-1])]
+        status = np.where(low, 'low', np.where(high, 'high', 'normal'))
+        return t, [np.char.mod('%.2f', temp), np.char.mod('%.1f', lo),
+                   np.char.mod('%.1f', hi), status, vmin, vmax]
+
+    def lab5_columns(self, n):
+        """Columns of demo.py's CSV for the next n samples"""
+        chunk = self.generate(n)
+        therm = np.where(chunk['dropout'], 0.0, np.round(chunk['temperature'], 2))
+        joystick = np.full(n, JOYSTICK_NAMES['home'], dtype='<U7')
+        for direction in DIRECTIONS:
+            joystick[chunk['joystick'] == direction] = JOYSTICK_NAMES[direction]
+        return chunk['t'], [np.char.mod('%.1f', np.rint(chunk['smooth'])),
+                            np.char.mod('%.1f', chunk['humidity']), chunk['light'],
+                            chunk['sound'], therm, joystick]
+
+    def rows(self, kind, n):
+        """(time, row) of the next n samples, row without the timestamp"""
+        t, columns = getattr(self, kind + '_columns')(n)
+        return zip(t.tolist(), zip(*(column.tolist() for column in columns)))
+
+    # -- emulator --------------------------------------------------------
+
+    def signals(self, layout='lab6'):
+        """{channel: f(t)} for pcf8591_sim (t: seconds since the device start)
+
+        lab6: AIN0-2 joystick (X, Y, button), AIN3 thermistor
+        lab5: AIN0 light, AIN1 sound, AIN2 thermistor (demo.py wiring)
+        """
+        source = _SignalSource(self)
+        if layout == 'lab6':
+            return {0: source.channel('joystick', 1), 1: source.channel('joystick', 0),
+                    2: source.channel('joystick', 2), 3: source.channel('code')}
+        if layout == 'lab5':
+            return {0: source.channel('light'), 1: source.channel('sound'),
+                    2: source.channel('code')}
+        raise ValueError(f"Unknown layout {layout!r}, expected 'lab6' or 'lab5'")
+
+
+class _SignalSource:
+    # Generates the streams in blocks as emulator time advances; the
+    # joystick is evaluated at the exact time, not at the sample rate
+    def __init__(self, synth, block=1024):
+        self.synth = synth
+        self.block = block
+        self.first = 0
+        self.chunk = synth.generate(block)
+
+    def _sample(self, t):
+        i = int(t * self.synth.rate_hz)
+        while i >= self.first + len(self.chunk['t']):
+            self.first += len(self.chunk['t'])
+            self.chunk = self.synth.generate(self.block)
+        return max(i - self.first, 0)
+
+    def channel(self, name, axis=None):
+        if name == 'joystick':
+            return lambda t: JOYSTICK_FRAMES[self.synth.joystick_at([t])[0]][axis]
+        return lambda t: float(self.chunk[name][self._sample(t)])
+
+
+def _timestamps(seconds, sep):
+    # local time strings, vectorized (UTC offset looked up once per hour)
+    seconds = np.floor(seconds).astype(np.int64)
+    unique, inverse = np.unique(seconds // 3600, return_inverse=True)
+    offsets = np.array([time.localtime(int(h) * 3600).tm_gmtoff for h in unique],
+                       dtype=np.int64)
+    local = (seconds + offsets[inverse]).astype('datetime64[s]')
+    text = np.datetime_as_string(local)
+    return text if sep == 'T' else np.char.replace(text, 'T', sep)
+
+
+def write_csv(path, kind='lab6', rows=1000000, seed=0, start=None, rate_hz=None,
+              chunk=100000):
+    """Write `rows` samples in the `kind` schema as fast as possible; rows written"""
+    header, _, sep, default_rate = SCHEMAS[kind]
+    if start is None:
+        start = datetime.fromisoformat(DEFAULT_START).timestamp()
+    synth = Synthetic(seed=seed, rate_hz=rate_hz or default_rate, start=start)
+    written = 0
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        done = 0
+        while done < rows:
+            n = min(chunk, rows - done)
+            t, columns = getattr(synth, kind + '_columns')(n)
+            writer.writerows(zip(_timestamps(t, sep).tolist(), *(column.tolist() for column in columns)))
+            written += len(t)
+            done += n
+    return written
+
+
+def stream_csv(path, kind='lab6', rows=600, seed=0, rate_hz=None):
+    """Log `rows` samples through CSVLogger, paced in real time; (logged, late)"""
+    from csv_logger import CSVLogger
+    header, fmt, _, default_rate = SCHEMAS[kind]
+    rate = rate_hz or default_rate
+    synth = Synthetic(seed=seed, rate_hz=rate, start=time.time())
+    late = 0
+    with CSVLogger(path, header=header, mode='w', timestamp_format=fmt) as logger:
+        deadline = time.monotonic()
+        for _, row in synth.rows(kind, rows):
+            logger.log(list(row))
+            deadline += 1.0 / rate
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                late += 1
+    return logger.rows_written, late
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic synthetic sensor data")
+    parser.add_argument('kind', choices=sorted(SCHEMAS))
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate', type=float, default=None,
+                        help="samples per second (default: the monitor's 0.5 Hz)")
+    parser.add_argument('--start', default=DEFAULT_START,
+                        help="first timestamp, ISO format (as fast as possible mode)")
+    parser.add_argument('--realtime', action='store_true',
+                        help="log through CSVLogger at --rate instead of as fast as possible")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.realtime:
+        written, late = stream_csv(args.path, args.kind, args.rows, args.seed, args.rate)
+        extra = f", {late} late"
+    else:
+        start = datetime.fromisoformat(args.start).timestamp()
+        written = write_csv(args.path, args.kind, args.rows, args.seed, start, args.rate)
+        extra = ""
+    elapsed = time.perf_counter() - t0
+    print(f"{written} rows ({args.kind}) -> {args.path}: {os.path.getsize(args.path) / 1e6:.1f} MB "
+          f"in {elapsed:.2f} s ({written / elapsed:,.0f} rows/s{extra})")
+
+
+if __name__ == "__main__":
+    main()
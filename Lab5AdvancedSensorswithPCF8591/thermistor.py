@@ -2,14 +2,21 @@
 import PCF8591 as ADC
 import RPi.GPIO as GPIO
 import time
-import math
+from sampler import Sampler
+from thermistor_model import Thermistor
 
 DO = 17
 GPIO.setmode(GPIO.BCM)
 
+# AIN0 is sampled at 100 Hz in the background; loop() reads from memory
+sampler = Sampler([0], rate_hz=100)
+model = Thermistor(beta=3950, r0=10000, t0=25)
+
 def setup():
 	ADC.setup(0x48)
+	ADC.set_pipelined(True)	# single-channel stream: 1 transaction per read
 	GPIO.setup(DO, GPIO.IN)
+	sampler.start()
 
 def Print(x):
 	if x == 1:
@@ -29,11 +36,13 @@ def loop():
 	status = 1
 	tmp = 1
 	while True:
-		analogVal = ADC.read(0)
-		Vr = 5 * float(analogVal) / 255
-		Rt = 10000 * Vr / (5 - Vr)
-		temp = 1/(((math.log(Rt / 10000)) / 3950) + (1 / (273.15+25)))
-		temp = temp - 273.15
+		analogVal = sampler.aggregate(0, 0.2)['mean']	# average since last print
+		if analogVal is None:	# no sample in the window: use the latest one
+			analogVal = sampler.value(0)
+		if analogVal is None:	# sampler has not read a frame yet
+			time.sleep(0.2)
+			continue
+		temp = model.to_celsius(analogVal)
 		print ('temperature = ', temp, 'C')
 
 		# For a threshold, uncomment one of the code for
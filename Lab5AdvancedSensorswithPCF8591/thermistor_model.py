@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+IoT Lab 5: Thermistor model (ADC code -> temperature)
+=====================================================
+
+One shared implementation of the Beta-equation conversion used by
+thermistor.py, demo.py and the Lab 6 monitor:
+
+    Vr   = Vref * code / 255
+    Rt   = R_fixed * Vr / (Vref - Vr)
+    1/T  = ln(Rt / R0) / Beta + 1 / T0
+
+The PCF8591 only produces 256 codes, so the conversion is precomputed
+once into a table: a scalar read costs one list lookup instead of a
+division and a logarithm. Fractional codes (averages) use the exact
+formula, and convert() handles whole NumPy arrays / CSV columns at once.
+
+Edge cases: codes 0 and 255 are the supply rails (shorted or open
+sensor, Rt = 0 or infinite) and always convert to NaN.
+
+Usage:
+    from thermistor_model import Thermistor
+
+    model = Thermistor()                 # Beta 3950, 10k at 25°C
+    model.to_celsius(128)                # scalar, table lookup
+    model.convert(np.array([90, 128]))   # vectorized
+"""
+
+import math
+
+import numpy as np
+
+KELVIN = 273.15
+
+
+class Thermistor:
+    """NTC thermistor on a voltage divider read by an 8-bit ADC"""
+
+    def __init__(self, beta=3950.0, r0=10000.0, t0=25.0, r_fixed=10000.0, vref=5.0):
+        self.beta = beta
+        self.r0 = r0
+        self.t0 = t0                # °C
+        self.r_fixed = r_fixed
+        self.vref = vref
+        self.table = [self._exact(code) for code in range(256)]
+        self._table_np = np.array(self.table, dtype=np.float64)
+
+    def __repr__(self):
+        return (f"Thermistor(beta={self.beta}, r0={self.r0}, t0={self.t0}, "
+                f"r_fixed={self.r_fixed}, vref={self.vref})")
+
+    def _exact(self, code):
+        if not 0 < code < 255:
+            return math.nan
+        vr = self.vref * code / 255
+        rt = self.r_fixed * vr / (self.vref - vr)
+        kelvin = 1 / (math.log(rt / self.r0) / self.beta + 1 / (KELVIN + self.t0))
+        return kelvin - KELVIN
+
+    def to_celsius(self, code):
+        """Temperature (°C) of one ADC code; NaN at the rails"""
+        if isinstance(code, int):
+            return self.table[code] if 0 <= code <= 255 else math.nan
+        if math.isnan(code):
+            return math.nan
+        if code == int(code):
+            return self.to_celsius(int(code))
+        return self._exact(code)
+
+    def convert(self, codes):
+        """Vectorized to_celsius() for arrays, lists or pandas columns"""
+        codes = np.asarray(codes)
+        if np.issubdtype(codes.dtype, np.integer):
+            out = np.full(codes.shape, np.nan)
+            valid = (codes >= 0) & (codes <= 255)
+            out[valid] = self._table_np[codes[valid]]
+            return out
+
+        codes = codes.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vr = self.vref * codes / 255
+            rt = self.r_fixed * vr / (self.vref - vr)
+            kelvin = 1 / (np.log(rt / self.r0) / self.beta + 1 / (KELVIN + self.t0))
+        out = kelvin - KELVIN
+        out[~((codes > 0) & (codes < 255))] = np.nan
+        return out
+
+
+# Default model matching the Lab 5/6 wiring (Beta 3950, 10k NTC, 10k divider)
+DEFAULT = Thermistor()
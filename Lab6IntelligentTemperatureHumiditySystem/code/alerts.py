@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+GTI700 Lab 6 - Temperature alert engine
+Team: Équipe 05
+
+Turns the per-sample limit check into alert episodes, so a temperature
+hovering at a limit neither floods the console nor inflates the counters:
+
+    hysteresis      an episode above temp_max ends only once the
+                    temperature is back below temp_max - hysteresis
+                    (above temp_min + hysteresis for a low episode)
+    min_duration    a limit must be crossed for this many seconds before
+                    an episode starts (0: the first violating sample)
+    cooldown        a new episode of the same kind within this many
+                    seconds of the last announced one is counted but not
+                    announced again
+
+Violating samples (samples_low/high, the CSV violation columns) and
+episodes (episodes_low/high) are counted separately. Output is one line
+per episode start and end, plus at most one aggregated status line per
+`status_interval` seconds (sample count, min/max since the previous line).
+A RateLimiter shared by several engines bounds the total number of lines
+per second: the cost of alerting no longer grows with the sample rate.
+
+Usage:
+    from alerts import AlertEngine, RateLimiter
+
+    engine = AlertEngine(hysteresis=0.5, min_duration=4, cooldown=60,
+                         status_interval=10, limiter=RateLimiter(5))
+    status = engine.update(temp, 20.0, 30.0)    # 'low', 'high' or 'normal'
+"""
+import time
+
+ALERTS = {
+    'low': ("🥶 ALERTE: Température TROP BASSE ({temp:.1f}°C < {limit:.1f}°C)",
+            "💡 Vous devriez augmenter le thermostat"),
+    'high': ("🔥 ALERTE: Température TROP ÉLEVÉE ({temp:.1f}°C > {limit:.1f}°C)",
+             "💡 Vous devriez diminuer le thermostat"),
+}
+STATUS_LINES = {
+    'normal': "✅ Température NORMALE: {temp:.1f}°C",
+    'low': "🥶 Température BASSE: {temp:.1f}°C",
+    'high': "🔥 Température ÉLEVÉE: {temp:.1f}°C",
+}
+
+
+class RateLimiter:
+    """Token bucket on output lines; suppressed lines are counted"""
+
+    def __init__(self, rate=10.0, burst=None, out=print):
+        self.rate = rate                    # lignes par seconde
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.out = out
+        self.emitted = 0
+        self.suppressed = 0
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._pending = 0                   # supprimées depuis la dernière ligne
+
+    def emit(self, line, now=None):
+        """Print `line` if a token is left; False if it was suppressed"""
+        now = time.monotonic() if now is None else now
+        if now > self._last:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+        if self._tokens < 1.0:
+            self.suppressed += 1
+            self._pending += 1
+            return False
+        self._tokens -= 1.0
+        if self._pending:
+            line += f"  (… {self._pending} message(s) supprimé(s))"
+            self._pending = 0
+        self.out(line)
+        self.emitted += 1
+        return True
+
+
+class AlertEngine:
+    """Limit state machine of one probe: hysteresis, min duration, cooldown"""
+
+    def __init__(self, name='', hysteresis=0.5, min_duration=0.0, cooldown=60.0,
+                 status_interval=10.0, limiter=None, out=print):
+        self.prefix = f"[{name}] " if name else ""
+        self.hysteresis = hysteresis
+        self.min_duration = min_duration
+        self.cooldown = cooldown
+        self.status_interval = status_interval     # 0: une ligne par mesure
+        self.limiter = limiter
+        self.out = out
+
+        self.state = 'normal'       # épisode en cours: 'low', 'high' ou 'normal'
+        self.samples = 0
+        self.samples_low = 0        # mesures hors limites (colonnes du CSV)
+        self.samples_high = 0
+        self.episodes_low = 0
+        self.episodes_high = 0
+        self.alerts_suppressed = 0  # débuts d'épisode non annoncés (cooldown)
+
+        self._pending = None        # (kind, since): limite franchie, durée minimale en attente
+        self._episode = None        # dict de l'épisode en cours
+        self._announced = {}        # kind -> instant de la dernière annonce
+        self._next_status = None
+        self._agg = None            # [n, min, max] depuis la dernière ligne d'état
+
+    @property
+    def episodes(self):
+        return self.episodes_low + self.episodes_high
+
+    def emit(self, line, now=None):
+        """Output one line (probe prefix, through the limiter if any)"""
+        line = self.prefix + line
+        if self.limiter is not None:
+            return self.limiter.emit(line, now)
+        self.out(line)
+        return True
+
+    def update(self, temp, temp_min, temp_max, now=None):
+        """Classify one sample, advance the episode state, maybe print"""
+        now = time.monotonic() if now is None else now
+        self.samples += 1
+        if temp < temp_min:
+            status = 'low'
+            self.samples_low += 1
+        elif temp > temp_max:
+            status = 'high'
+            self.samples_high += 1
+        else:
+            status = 'normal'
+
+        if self.state != 'normal':
+            kind = self.state
+            if kind == 'high':
+                cleared = temp <= temp_max - self.hysteresis
+            else:
+                cleared = temp >= temp_min + self.hysteresis
+            if cleared or status not in ('normal', kind):
+                self._end(temp, now)
+            else:
+                episode = self._episode
+                episode['samples'] += 1
+                episode['extreme'] = max(episode['extreme'], temp) if kind == 'high' \
+                    else min(episode['extreme'], temp)
+        if self.state == 'normal':
+            if status == 'normal':
+                self._pending = None
+            else:
+                if self._pending is None or self._pending[0] != status:
+                    self._pending = (status, now)
+                if now - self._pending[1] >= self.min_duration:
+                    self._begin(status, temp, temp_min if status == 'low' else temp_max, now)
+
+        # état de l'épisode (hystérésis), sinon celui de la mesure
+        shown = self.state if self.state != 'normal' else status
+        self._status_line(shown, temp, temp_min, temp_max, now)
+        return status
+
+    def _begin(self, kind, temp, limit, now):
+        self._pending = None
+        self.state = kind
+        if kind == 'low':
+            self.episodes_low += 1
+        else:
+            self.episodes_high += 1
+        last = self._announced.get(kind)
+        announce = last is None or now - last >= self.cooldown
+        self._episode = {'kind': kind, 'start': now, 'samples': 1,
+                         'extreme': temp, 'announced': announce}
+        if not announce:
+            self.alerts_suppressed += 1
+            return
+        self._announced[kind] = now
+        alert, advice = ALERTS[kind]
+        self.emit(f"{alert.format(temp=temp, limit=limit)} — {advice}", now)
+
+    def _end(self, temp, now):
+        episode, self._episode = self._episode, None
+        self.state = 'normal'
+        if episode['announced']:
+            extreme = 'max' if episode['kind'] == 'high' else 'min'
+            self.emit(f"↩️ Retour à la normale ({temp:.1f}°C) après "
+                       f"{now - episode['start']:.0f} s, {episode['samples']} mesure(s), "
+                       f"{extreme} {episode['extreme']:.1f}°C", now)
+
+    def _status_line(self, state, temp, temp_min, temp_max, now):
+        agg = self._agg
+        if agg is None:
+            agg = self._agg = [0, temp, temp]
+        agg[0] += 1
+        agg[1] = min(agg[1], temp)
+        agg[2] = max(agg[2], temp)
+        if self._next_status is not None and now < self._next_status:
+            return
+        line = STATUS_LINES[state].format(temp=temp)
+        line += f" (Limites: {temp_min:.1f}°C - {temp_max:.1f}°C)"
+        if agg[0] > 1:
+            line += f" — {agg[0]} mesures, {agg[1]:.1f}-{agg[2]:.1f}°C"
+        self.emit(line, now)
+        self._agg = None
+        self._next_status = now + self.status_interval
+
+    # Compteurs sauvegardés dans le point de reprise (checkpoint.py)
+    COUNTERS = ('samples', 'samples_low', 'samples_high', 'episodes_low',
+                'episodes_high', 'alerts_suppressed')
+
+    def counters(self):
+        """Counters to checkpoint (the episode in progress is not kept)"""
+        return {name: getattr(self, name) for name in self.COUNTERS}
+
+    def restore(self, state):
+        for name in self.COUNTERS:
+            setattr(self, name, int(state.get(name, 0)))
+
+    def summary(self):
+        """Counters as a dict (final report)"""
+        return {
+            'samples': self.samples,
+            'samples_low': self.samples_low,
+            'samples_high': self.samples_high,
+            'episodes_low': self.episodes_low,
+            'episodes_high': self.episodes_high,
+            'alerts_suppressed': self.alerts_suppressed,
+            'lines_suppressed': self.limiter.suppressed if self.limiter is not None else 0,
+        }
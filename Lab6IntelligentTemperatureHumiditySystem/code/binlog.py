@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+GTI700 Lab 6 - Binary measurement log
+Team: Équipe 05
+
+Optional binary alternative to results_equipe_xx.csv. The file is a 16-byte
+header followed by fixed-size little-endian records (32 bytes each):
+
+    header   magic b'GTI700L6', version (u2), record size (u2), reserved (4)
+    record   timestamp (f8, Unix seconds), temperature, limit_min,
+             limit_max (f4), violations_min, violations_max (u4),
+             status (u1: 0 normal, 1 low, 2 high), padding (3)
+
+read_log() memory-maps the file as a NumPy structured array: no parsing,
+columns are ready for analysis. A partially written last record (power
+loss during a write) is ignored.
+
+Usage:
+    python3 binlog.py to-bin results_equipe_05.csv results_equipe_05.bin
+    python3 binlog.py to-csv results_equipe_05.bin results_equipe_05.csv
+    python3 binlog.py bench --rows 2000000     # CSV parse vs memory map
+
+    from binlog import read_log
+    records = read_log('results_equipe_05.bin')
+    records['temperature'].mean()
+"""
+import argparse
+import csv
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from csv_logger import CSVLogger
+
+MAGIC = b'GTI700L6'
+VERSION = 1
+HEADER = struct.Struct('<8sHH4x')
+HEADER_SIZE = HEADER.size
+
+DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('temperature', '<f4'),
+    ('limit_min', '<f4'),
+    ('limit_max', '<f4'),
+    ('violations_min', '<u4'),
+    ('violations_max', '<u4'),
+    ('status', 'u1'),
+    ('_pad', 'V3'),
+])
+
+STATUS_NAMES = ('normal', 'low', 'high')
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+STATUS_UNKNOWN = 255
+
+CSV_HEADER = ['timestamp', 'temperature', 'limit_min', 'limit_max',
+              'status', 'violations_min', 'violations_max']
+TIMESTAMP_FORMAT = 'ISO8601'      # '%Y-%m-%d %H:%M:%S', .%f in high-rate mode
+
+
+def encode(rows):
+    """(timestamp, [temp, min, max, status, viol_min, viol_max]) -> records"""
+    records = np.zeros(len(rows), dtype=DTYPE)
+    for i, (t, (temp, lo, hi, status, vmin, vmax)) in enumerate(rows):
+        records[i] = (t, temp, lo, hi, vmin, vmax,
+                      STATUS_CODES.get(status, STATUS_UNKNOWN), b'')
+    return records
+
+
+def write_header(file):
+    file.write(HEADER.pack(MAGIC, VERSION, DTYPE.itemsize))
+
+
+def read_header(file):
+    data = file.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Fichier binaire tronqué (en-tête incomplet)")
+    magic, version, size = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError("Ce n'est pas un journal binaire Lab 6")
+    if version != VERSION or size != DTYPE.itemsize:
+        raise ValueError(f"Version de format non supportée: {version} ({size} octets)")
+    return version
+
+
+def read_log(path):
+    """Memory-mapped structured array of every complete record"""
+    with open(path, 'rb') as file:
+        read_header(file)
+    count = (os.path.getsize(path) - HEADER_SIZE) // DTYPE.itemsize
+    if count <= 0:
+        return np.zeros(0, dtype=DTYPE)
+    return np.memmap(path, dtype=DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+
+def status_names(records):
+    """Status codes -> names ('inconnu' for unknown codes)"""
+    names = np.array(STATUS_NAMES + ('inconnu',), dtype=object)
+    codes = np.minimum(records['status'], len(STATUS_NAMES))
+    return names[codes]
+
+
+def to_dataframe(records):
+    """DataFrame with the same columns as the CSV (local time, as datetime)"""
+    import pandas as pd
+    seconds = records['timestamp']
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(seconds + _local_offsets(seconds), unit='s'),
+        'temperature': records['temperature'],
+        'limit_min': records['limit_min'],
+        'limit_max': records['limit_max'],
+        'status': status_names(records),
+        'violations_min': records['violations_min'],
+        'violations_max': records['violations_max'],
+    })
+    return df
+
+
+class BinaryLogger(CSVLogger):
+    """CSVLogger (same queue, writer thread and policies) writing records"""
+
+    def __init__(self, path, mode='a', **kwargs):
+        kwargs.pop('timestamp_format', None)
+        super().__init__(path, mode=mode, **kwargs)
+        self.timestamped = True     # raw Unix time in every record
+
+    def _open(self, path, mode):
+        new = self._is_new(path, mode)
+        self._file = open(path, mode + 'b')
+        if new:
+            write_header(self._file)
+            self._file.flush()
+        else:
+            with open(path, 'rb') as file:
+                read_header(file)
+            # enregistrement partiel (coupure): repartir d'une frontière
+            size = os.path.getsize(path)
+            extra = (size - HEADER_SIZE) % DTYPE.itemsize
+            if extra:
+                self._file.truncate(size - extra)
+
+    def _write_rows(self, batch):
+        self._file.write(encode(batch).tobytes())
+
+
+def _local_offsets(utc_seconds):
+    # Décalage heure locale - UTC de chaque instant (calculé par heure)
+    hours = np.floor_divide(utc_seconds, 3600).astype(np.int64)
+    unique, inverse = np.unique(hours, return_inverse=True)
+    offsets = np.array([time.localtime(int(h) * 3600).tm_gmtoff for h in unique],
+                       dtype=np.int64)
+    return offsets[inverse]
+
+
+def csv_to_bin(csv_path, bin_path):
+    """Convert an existing CSV log; returns the number of records"""
+    import pandas as pd
+    df = pd.read_csv(csv_path)
+    records = np.zeros(len(df), dtype=DTYPE)
+    # horodatage local -> temps Unix (décalage de l'heure correspondante)
+    naive = (pd.to_datetime(df['timestamp'], format=TIMESTAMP_FORMAT)
+             - pd.Timestamp('1970-01-01')) / pd.Timedelta(seconds=1)
+    naive = naive.to_numpy(dtype=np.float64)
+    records['timestamp'] = naive - _local_offsets(naive - _local_offsets(naive))
+    for column in ('temperature', 'limit_min', 'limit_max'):
+        records[column] = pd.to_numeric(df[column], errors='coerce')
+    for column in ('violations_min', 'violations_max'):
+        records[column] = pd.to_numeric(df[column], errors='coerce').fillna(0)
+    records['status'] = df['status'].map(STATUS_CODES).fillna(STATUS_UNKNOWN)
+    with open(bin_path, 'wb') as file:
+        write_header(file)
+        file.write(records.tobytes())
+    return len(records)
+
+
+def bin_to_csv(bin_path, csv_path):
+    """Write a binary log back in the monitor's CSV format"""
+    records = read_log(bin_path)
+    seconds = np.floor(records['timestamp']).astype(np.int64)
+    local = (seconds + _local_offsets(seconds)).astype('datetime64[s]')
+    timestamps = np.char.replace(np.datetime_as_string(local), 'T', ' ')
+    columns = [
+        timestamps,
+        np.char.mod('%.2f', records['temperature']),
+        np.char.mod('%.1f', records['limit_min']),
+        np.char.mod('%.1f', records['limit_max']),
+        status_names(records),
+        records['violations_min'],
+        records['violations_max'],
+    ]
+    with open(csv_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(zip(*(column.tolist() for column in columns)))
+    return len(records)
+
+
+def synthetic_records(rows, seed=0):
+    """Plausible measurements every 2 s (benchmarks)"""
+    rng = np.random.default_rng(seed)
+    records = np.zeros(rows, dtype=DTYPE)
+    records['timestamp'] = time.time() - 2.0 * rows + 2.0 * np.arange(rows)
+    records['temperature'] = np.round(24 + 4 * rng.standard_normal(rows), 2)
+    records['limit_min'] = 20.0
+    records['limit_max'] = 30.0
+    low = records['temperature'] < 20
+    high = records['temperature'] > 30
+    records['status'] = np.where(low, 1, np.where(high, 2, 0))
+    records['violations_min'] = np.cumsum(low)
+    records['violations_max'] = np.cumsum(high)
+    return records
+
+
+def bench(rows):
+    import pandas as pd
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path = os.path.join(tmp, 'log.bin')
+        csv_path = os.path.join(tmp, 'log.csv')
+        with open(bin_path, 'wb') as file:
+            write_header(file)
+            file.write(synthetic_records(rows).tobytes())
+        start = time.perf_counter()
+        bin_to_csv(bin_path, csv_path)
+        print(f"📝 {rows} enregistrements: CSV {os.path.getsize(csv_path) / 1e6:.1f} Mo "
+              f"(écrit en {time.perf_counter() - start:.1f} s), "
+              f"binaire {os.path.getsize(bin_path) / 1e6:.1f} Mo")
+
+        start = time.perf_counter()
+        df = pd.read_csv(csv_path)
+        for column in ('temperature', 'limit_min', 'limit_max'):
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+        csv_mean = df['temperature'].mean()
+        csv_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        records = read_log(bin_path)
+        bin_mean = records['temperature'].mean(dtype=np.float64)
+        limit_max = records['limit_max'].max()
+        bin_time = time.perf_counter() - start
+
+        print(f"CSV   pd.read_csv + to_numeric + mean  {csv_time * 1e3:9.1f} ms")
+        print(f"BIN   memmap + mean                   {bin_time * 1e3:9.1f} ms "
+              f"(x{csv_time / bin_time:.0f}, écart moyenne {abs(csv_mean - bin_mean):.2e}, max {limit_max})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journal binaire Lab 6")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('to-bin', help="CSV -> binaire")
+    p.add_argument('source')
+    p.add_argument('target')
+    p = sub.add_parser('to-csv', help="binaire -> CSV")
+    p.add_argument('source')
+    p.add_argument('target')
+    p = sub.add_parser('bench', help="analyse CSV vs binaire")
+    p.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    if args.command == 'to-bin':
+        print(f"✅ {csv_to_bin(args.source, args.target)} enregistrements → {args.target}")
+    elif args.command == 'to-csv':
+        print(f"✅ {bin_to_csv(args.source, args.target)} enregistrements → {args.target}")
+    else:
+        bench(args.rows)
+
+
+if __name__ == "__main__":
+    main()
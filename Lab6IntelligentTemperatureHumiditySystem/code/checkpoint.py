@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+GTI700 Lab 6 - Crash-safe monitor checkpoints
+Team: Équipe 05
+
+The monitor's state (limits, violation and episode counters, measurement
+counter) is saved every `interval` seconds to a small JSON file. The file
+is replaced atomically (temporary file, fsync, rename, fsync of the
+directory), so after a crash or power loss it holds either the previous or
+the new checkpoint, never a half-written one. On restart the monitor reloads it in O(1) and appends to
+its existing log instead of re-scanning or truncating it.
+
+Counters resume from the last checkpoint: after a crash they may lag the
+log by at most one interval of measurements (clean stops save a final
+checkpoint). An alert episode in progress is not resumed.
+
+Usage:
+    from checkpoint import Checkpoint
+
+    checkpoint = Checkpoint('results_equipe_05.checkpoint.json', interval=30)
+    state = checkpoint.load()           # None if missing or unreadable
+    if checkpoint.due():
+        checkpoint.save({'measurements': n, 'probe': probe.state()})
+"""
+import json
+import os
+import time
+
+VERSION = 1
+
+
+class Checkpoint:
+    """Periodic atomic JSON checkpoint of the monitor state"""
+
+    def __init__(self, path, interval=30.0):
+        self.path = path
+        self.interval = interval
+        self.saves = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self._next = time.monotonic() + interval
+
+    def due(self, now=None):
+        """True once `interval` seconds have passed since the last save"""
+        return (time.monotonic() if now is None else now) >= self._next
+
+    def load(self):
+        """Last saved state (dict), or None if missing or unreadable"""
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Point de reprise illisible ({self.path}): {e}")
+            return None
+        if data.get('version') != VERSION:
+            print(f"⚠️ Point de reprise ignoré: version {data.get('version')!r}")
+            return None
+        return data['state']
+
+    def save(self, state):
+        """Write `state` atomically; False (and a warning) on error"""
+        start = time.perf_counter()
+        self._next = time.monotonic() + self.interval
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w') as file:
+                json.dump({'version': VERSION, 'saved_at': time.time(), 'state': state}, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp, self.path)      # l'ancien ou le nouveau, jamais un mélange
+            # le renommage n'est durable qu'une fois le dossier synchronisé
+            folder = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(folder)
+            finally:
+                os.close(folder)
+        except OSError as e:
+            self.errors += 1
+            print(f"⚠️ Erreur point de reprise ({self.path}): {e}")
+            return False
+        self.saves += 1
+        self.last_duration = time.perf_counter() - start
+        return True
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+GTI700 Lab 6 - Multi-sensor temperature monitor
+Team: Équipe 05
+
+temperature_system_final.py generalized to many thermistors on several
+PCF8591 boards and buses:
+
+    SensorMonitor   one probe: its own limits, alert engine (alerts.py:
+                    hysteresis, minimum duration, cooldown, episodes)
+                    and log (CSV or binary, optionally rotated); same
+                    rows as the single-sensor monitor
+    Scheduler       one measurement cycle for every probe. Each board is
+                    read with a single I2C transaction per cycle
+                    (Device.read_frames: N frames of all its channels),
+                    boards on different buses in parallel, one worker per
+                    bus. The logs share one writer thread (SharedWriter),
+                    so the thread count does not grow with the number
+                    of probes.
+
+Sensors are given on the command line (name=ADDRESS:CHANNEL[:MIN:MAX][@BUS])
+or in a JSON file: [{"name": "serre", "address": "0x49", "channel": 0,
+"bus": 1, "min": 15, "max": 35}, ...]. Each probe logs to
+results_equipe_xx_<name>.csv (or .bin), readable by scriptData.py. Console
+output is one line per alert episode start/end plus one status line per
+probe every --status-interval seconds, capped at --max-lines lines/s overall.
+Limits and counters of every probe are checkpointed atomically every 30 s
+(<prefix>.sensors.checkpoint.json, see checkpoint.py) and resumed on
+restart for the probes whose log still exists; logs are always appended to.
+
+Usage:
+    python3 monitor.py --sensor salon=0x48:3 --sensor serre=0x49:0:15:35
+    python3 monitor.py --config sondes.json --interval 5 --format bin
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import PCF8591 as ADC
+from alerts import AlertEngine, RateLimiter
+from binlog import BinaryLogger
+from checkpoint import Checkpoint
+from csv_logger import CSVLogger, SharedWriter, index_path
+from oversample import decimate
+from thermistor_model import DEFAULT as DEFAULT_MODEL
+
+CSV_HEADER = ['timestamp', 'temperature', 'limit_min', 'limit_max',
+              'status', 'violations_min', 'violations_max']
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class SensorMonitor:
+    """Une thermistance: ses limites, ses compteurs de violations et son journal"""
+
+    def __init__(self, name, channel, device=None, temp_min=20.0, temp_max=30.0,
+                 log=None, model=DEFAULT_MODEL, method='trimmed', trim=0.25, label=True,
+                 alerts=None):
+        self.name = name
+        self.channel = channel
+        self.device = device        # None: le périphérique de ADC.setup()
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        # Hystérésis, durée minimale, cooldown et compteurs de violations
+        self.alerts = alerts if alerts is not None else AlertEngine(name if label else '')
+        self.measurements = 0
+        self.errors = 0
+        self.log = log              # CSVLogger / BinaryLogger, ou None
+        self.binary = isinstance(log, BinaryLogger)
+        self.model = model
+        self.method = method
+        self.trim = trim
+        self.prefix = f"[{name}] " if label else ""
+        self.last_temp = None
+
+    def __repr__(self):
+        return f"SensorMonitor({self.name!r}, channel={self.channel}, device={self.device!r})"
+
+    @property
+    def violations_min(self):
+        return self.alerts.samples_low
+
+    @property
+    def violations_max(self):
+        return self.alerts.samples_high
+
+    @property
+    def violations(self):
+        return self.violations_min + self.violations_max
+
+    def convert(self, code):
+        """Code ADC (0-255, fractionnaire après décimation) → température (°C)"""
+        temp = self.model.to_celsius(code)
+        if math.isnan(temp):
+            # Codes 0 et 255: capteur en court-circuit ou débranché
+            raise ValueError(f"Valeur ADC hors plage: {code}")
+        # Vérification cohérence (température raisonnable)
+        if not (-10 <= temp <= 60):
+            raise ValueError(f"Température incohérente: {temp}°C")
+        return temp
+
+    def check(self, temp):
+        """Vérification des limites (moteur d'alertes); 'low', 'high' ou 'normal'"""
+        self.last_temp = temp
+        return self.alerts.update(temp, self.temp_min, self.temp_max)
+
+    def row(self, temp, status):
+        """Ligne de journal d'une mesure (horodatage ajouté par le journal)"""
+        if self.binary:
+            return [temp, self.temp_min, self.temp_max, status,
+                    self.violations_min, self.violations_max]
+        return [f"{temp:.2f}", f"{self.temp_min:.1f}", f"{self.temp_max:.1f}",
+                status, self.violations_min, self.violations_max]
+
+    def record(self, temp, status):
+        """Mettre la mesure en file (écrite par le thread du journal)"""
+        self.measurements += 1
+        if self.log is None:
+            return
+        try:
+            self.log.log(self.row(temp, status))
+        except Exception as e:
+            self.alerts.emit(f"❌ Erreur sauvegarde CSV: {e}")
+
+    def measure(self, burst):
+        """Décimer une rafale, vérifier et journaliser; (temp, status) ou None"""
+        try:
+            temp = self.convert(decimate(burst, self.method, self.trim)['value'])
+        except ValueError as e:
+            self.errors += 1
+            # par le moteur d'alertes: débit limité si le capteur est débranché
+            self.alerts.emit(f"⚠️ Erreur capteur température: {e}")
+            return None
+        status = self.check(temp)
+        self.record(temp, status)
+        return temp, status
+
+    def state(self):
+        """Limites et compteurs (point de reprise)"""
+        return {'temp_min': self.temp_min, 'temp_max': self.temp_max,
+                'measurements': self.measurements, 'errors': self.errors,
+                'alerts': self.alerts.counters()}
+
+    def restore(self, state):
+        """Reprendre limites et compteurs depuis state()"""
+        self.temp_min = float(state['temp_min'])
+        self.temp_max = float(state['temp_max'])
+        self.measurements = int(state.get('measurements', 0))
+        self.errors = int(state.get('errors', 0))
+        self.alerts.restore(state.get('alerts', {}))
+
+    def adjust(self, direction):
+        """Appliquer une direction du joystick aux limites (sans attente)"""
+        if direction == 'up':
+            self.temp_max += 1.0
+            print(f"{self.prefix}🔺 Limite MAXIMALE augmentée: {self.temp_max:.1f}°C")
+            return True
+        elif direction == 'down':
+            self.temp_max = max(self.temp_max - 1.0, self.temp_min + 1.0)  # Sécurité
+            print(f"{self.prefix}🔻 Limite MAXIMALE diminuée: {self.temp_max:.1f}°C")
+            return True
+        elif direction == 'right':
+            self.temp_min = min(self.temp_min + 1.0, self.temp_max - 1.0)  # Sécurité
+            print(f"{self.prefix}▶️ Limite MINIMALE augmentée: {self.temp_min:.1f}°C")
+            return True
+        elif direction == 'left':
+            self.temp_min -= 1.0
+            print(f"{self.prefix}◀️ Limite MINIMALE diminuée: {self.temp_min:.1f}°C")
+            return True
+        elif direction == 'pressed':
+            self.print_state()
+            return True
+        return False
+
+    def print_state(self):
+        print(f"\n📊 ÉTAT ACTUEL{' ' + self.prefix.strip() if self.prefix else ''}:")
+        print(f"   Limites: {self.temp_min:.1f}°C ← → {self.temp_max:.1f}°C")
+        print(f"   Violations: MIN={self.violations_min}, MAX={self.violations_max}")
+        print(f"   Total violations: {self.violations}")
+        print(f"   Épisodes: BAS={self.alerts.episodes_low}, HAUT={self.alerts.episodes_high}")
+
+    def print_stats(self, measurement_counter):
+        print(f"\n📈 STATISTIQUES {self.prefix}(après {measurement_counter} mesures):")
+        print(f"   🚨 Total violations: {self.violations} "
+              f"({self.alerts.episodes} épisode(s))")
+        if self.last_temp is not None:
+            print(f"   📊 Température actuelle: {self.last_temp:.1f}°C")
+        print(f"   ⚙️ Limites: {self.temp_min:.1f}°C - {self.temp_max:.1f}°C")
+
+
+class Scheduler:
+    """Cycle de mesure commun: une transaction I2C par carte et par cycle"""
+
+    def __init__(self, monitors, interval=2.0, n=16, stats_interval=60.0):
+        self.monitors = list(monitors)
+        self.interval = interval
+        self.stats_interval = stats_interval
+        self.n = n                  # conversions par sonde et par cycle
+        self.cycles = 0
+        self.overruns = 0           # cycles plus longs que l'intervalle
+        self.read_errors = 0
+        self.last_duration = 0.0
+        self._buses = None
+        self._executor = None
+
+    def _group(self):
+        # {busnum: [(device, [monitors])]}, résolu au premier cycle
+        # (après ADC.setup() pour les sondes sans périphérique explicite)
+        boards = {}
+        for monitor in self.monitors:
+            dev = monitor.device if monitor.device is not None else ADC.device
+            boards.setdefault((dev.busnum, dev.address), (dev, []))[1].append(monitor)
+        buses = {}
+        for dev, monitors in boards.values():
+            buses.setdefault(dev.busnum, []).append((dev, monitors))
+        return buses
+
+    def _read_board(self, dev, monitors):
+        # N trames de tous les canaux utilisés -> une rafale par sonde
+        chns = sorted({monitor.channel for monitor in monitors})
+        try:
+            frames = dev.read_frames(chns, self.n)
+        except Exception as e:
+            self.read_errors += 1
+            print(f"⚠️ Erreur lecture carte {dev!r}: {e}")
+            return []
+        bursts = {chn: [frame[i] for frame in frames] for i, chn in enumerate(chns)}
+        return [(monitor, bursts[monitor.channel]) for monitor in monitors]
+
+    def _read_bus(self, boards):
+        # les cartes d'un même bus sont lues l'une après l'autre (bus série)
+        return [item for dev, monitors in boards for item in self._read_board(dev, monitors)]
+
+    def read(self):
+        """(sonde, rafale) pour chaque sonde, cartes lues en un seul passage"""
+        if self._buses is None:
+            self._buses = self._group()
+            if len(self._buses) > 1:
+                self._executor = ThreadPoolExecutor(max_workers=len(self._buses),
+                                                    thread_name_prefix='monitor-bus')
+        if self._executor is None:
+            return [item for boards in self._buses.values() for item in self._read_bus(boards)]
+        futures = [self._executor.submit(self._read_bus, boards) for boards in self._buses.values()]
+        return [item for future in futures for item in future.result()]
+
+    def cycle(self):
+        """Lire, vérifier et journaliser chaque sonde; [(sonde, (temp, status) ou None)]"""
+        start = time.perf_counter()
+        results = [(monitor, monitor.measure(burst)) for monitor, burst in self.read()]
+        self.cycles += 1
+        self.last_duration = time.perf_counter() - start
+        return results
+
+    def run(self, cycles=None, on_cycle=None):
+        """Mesurer toutes les `interval` s (échéances absolues) jusqu'à Ctrl+C ou `cycles`"""
+        deadline = time.monotonic()
+        next_stats = deadline + self.stats_interval
+        while cycles is None or self.cycles < cycles:
+            results = self.cycle()
+            if on_cycle is not None:
+                on_cycle(results)
+            # Statistiques périodiques (par durée: bornées quel que soit le rythme)
+            if time.monotonic() >= next_stats:
+                next_stats += self.stats_interval
+                for monitor in self.monitors:
+                    monitor.print_stats(self.cycles)
+            deadline += self.interval
+            remaining = deadline - time.monotonic()
+            if remaining < 0:
+                self.overruns += 1
+                deadline = time.monotonic()     # en retard: resynchroniser
+            else:
+                time.sleep(remaining)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def parse_sensor(text):
+    """nom=ADRESSE:CANAL[:MIN:MAX][@BUS] → dict de sonde"""
+    name, _, spec = text.partition('=')
+    spec, _, bus = spec.partition('@')
+    parts = spec.split(':')
+    if not name or len(parts) not in (2, 4):
+        raise argparse.ArgumentTypeError(f"Sonde invalide: {text!r} (nom=ADRESSE:CANAL[:MIN:MAX][@BUS])")
+    sensor = {'name': name, 'address': parts[0], 'channel': int(parts[1]), 'bus': int(bus or 1)}
+    if len(parts) == 4:
+        sensor['min'], sensor['max'] = float(parts[2]), float(parts[3])
+    return sensor
+
+
+def build_monitors(sensors, prefix, log_format='csv', rotate=None, shared=None, alerts=None):
+    """SensorMonitor + journal pour chaque dict de sonde; cartes partagées par adresse
+
+    `alerts`: arguments de AlertEngine (limiteur compris); un dict de sonde
+    peut redéfinir hysteresis, min_duration et cooldown.
+    """
+    alerts = alerts or {}
+    devices = {}
+    monitors = []
+    for sensor in sensors:
+        address = sensor.get('address', 0x48)
+        if isinstance(address, str):
+            address = int(address, 0)
+        key = (sensor.get('bus', 1), address)
+        if key not in devices:
+            devices[key] = ADC.Device(address, busnum=key[0])
+        path = f"{prefix}_{sensor['name']}.{log_format}"
+        if log_format == 'bin':
+            log = BinaryLogger(path, rotate=rotate, flush_interval=10.0, fsync='flush',
+                               on_full='block', shared=shared)
+        else:
+            log = CSVLogger(path, header=CSV_HEADER, rotate=rotate,
+                            timestamp_format=TIMESTAMP_FORMAT, flush_interval=10.0,
+                            fsync='flush', on_full='block', shared=shared)
+        options = dict(alerts)
+        options.update({k: sensor[k] for k in ('hysteresis', 'min_duration', 'cooldown')
+                        if k in sensor})
+        monitors.append(SensorMonitor(sensor['name'], sensor['channel'], device=devices[key],
+                                      temp_min=sensor.get('min', 20.0),
+                                      temp_max=sensor.get('max', 30.0), log=log,
+                                      alerts=AlertEngine(sensor['name'], **options)))
+    return monitors
+
+
+def save_checkpoint(checkpoint, scheduler):
+    checkpoint.save({'cycles': scheduler.cycles,
+                     'sensors': {monitor.name: monitor.state() for monitor in scheduler.monitors}})
+
+
+def resume(checkpoint, scheduler):
+    """Reprendre les sondes dont le journal existe encore; nombre de sondes reprises"""
+    state = checkpoint.load()
+    if state is None:
+        return 0
+    resumed = 0
+    for monitor in scheduler.monitors:
+        saved = state.get('sensors', {}).get(monitor.name)
+        path = monitor.log.path
+        if saved is not None and (os.path.exists(path) or os.path.exists(index_path(path))):
+            monitor.restore(saved)
+            resumed += 1
+    if resumed:
+        scheduler.cycles = int(state.get('cycles', 0))
+    return resumed
+
+
+def final_report(scheduler, duration):
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL:")
+    print("=" * 60)
+    print(f"⏱️  Durée totale d'exécution: {duration:.1f} secondes")
+    print(f"📏 Cycles de mesure: {scheduler.cycles} "
+          f"(retards: {scheduler.overruns}, dernier cycle: {scheduler.last_duration * 1e3:.1f} ms)")
+    for monitor in scheduler.monitors:
+        rate = monitor.violations / monitor.measurements * 100 if monitor.measurements else 0.0
+        print(f"{monitor.prefix}mesures={monitor.measurements} erreurs={monitor.errors} "
+              f"violations MIN={monitor.violations_min} MAX={monitor.violations_max} "
+              f"({rate:.1f}%), épisodes BAS={monitor.alerts.episodes_low} "
+              f"HAUT={monitor.alerts.episodes_high}, "
+              f"limites {monitor.temp_min:.1f}°C - {monitor.temp_max:.1f}°C")
+    limiter = scheduler.monitors[0].alerts.limiter if scheduler.monitors else None
+    if limiter is not None and limiter.suppressed:
+        print(f"🔇 Lignes supprimées (limite de débit): {limiter.suppressed}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Surveillance multi-sondes Lab 6")
+    parser.add_argument('--sensor', type=parse_sensor, action='append', default=[],
+                        metavar='NOM=ADRESSE:CANAL[:MIN:MAX][@BUS]')
+    parser.add_argument('--config', help="fichier JSON: liste de sondes")
+    parser.add_argument('--interval', type=float, default=2.0, help="secondes entre deux cycles")
+    parser.add_argument('--oversample', type=int, default=16, help="conversions par sonde et par cycle")
+    parser.add_argument('--prefix', default='results_equipe_xx')
+    parser.add_argument('--format', choices=('csv', 'bin'),
+                        default=os.environ.get('LAB6_LOG_FORMAT', 'csv'))
+    parser.add_argument('--rotate', choices=('hour', 'day', 'none'),
+                        default=os.environ.get('LAB6_LOG_ROTATE', 'none'))
+    parser.add_argument('--hysteresis', type=float, default=0.5, help="°C")
+    parser.add_argument('--min-duration', type=float, default=0.0,
+                        help="secondes hors limite avant une alerte")
+    parser.add_argument('--cooldown', type=float, default=60.0,
+                        help="secondes entre deux annonces du même type")
+    parser.add_argument('--status-interval', type=float, default=10.0,
+                        help="secondes entre deux lignes d'état par sonde")
+    parser.add_argument('--max-lines', type=float, default=20.0,
+                        help="lignes de console par seconde, toutes sondes confondues")
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0,
+                        help="secondes entre deux points de reprise")
+    args = parser.parse_args()
+
+    sensors = list(args.sensor)
+    if args.config:
+        with open(args.config) as file:
+            sensors += json.load(file)
+    if not sensors:
+        parser.error("aucune sonde (--sensor ou --config)")
+
+    shared = SharedWriter()
+    alerts = {'hysteresis': args.hysteresis, 'min_duration': args.min_duration,
+              'cooldown': args.cooldown, 'status_interval': args.status_interval,
+              'limiter': RateLimiter(args.max_lines)}
+    monitors = build_monitors(sensors, args.prefix, args.format,
+                              None if args.rotate == 'none' else args.rotate, shared, alerts)
+    scheduler = Scheduler(monitors, interval=args.interval, n=args.oversample)
+    print(f"🚀 {len(monitors)} sonde(s) sur "
+          f"{len({(m.device.busnum, m.device.address) for m in monitors})} carte(s)")
+    # reprise avant d'ouvrir les journaux (un journal absent = nouveau départ)
+    checkpoint = Checkpoint(f"{args.prefix}.sensors.checkpoint.json", interval=args.checkpoint_interval)
+    resumed = resume(checkpoint, scheduler)
+    if resumed:
+        print(f"♻️ Reprise de {resumed} sonde(s) après {scheduler.cycles} cycles ({checkpoint.path})")
+    for monitor in monitors:
+        monitor.log.start()
+
+    def on_cycle(results):
+        if checkpoint.due():
+            save_checkpoint(checkpoint, scheduler)
+
+    start = time.time()
+    try:
+        scheduler.run(on_cycle=on_cycle)
+    except KeyboardInterrupt:
+        print("\n\n🛑 ARRÊT DU SYSTÈME DEMANDÉ")
+    finally:
+        scheduler.close()
+        shared.close()
+        save_checkpoint(checkpoint, scheduler)
+        final_report(scheduler, time.time() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,57 +12,621 @@ Analyzes:
 - System performance metrics
 - Data quality assessment
 
-Usage: python3 analysis_equipe_05.py
+Usage: python3 analysis_equipe_05.py [results_equipe_05.csv | results_equipe_05.bin]
+                                     [--from "2025-07-04 14:00"] [--to "2025-07-04 15:00"]
+                                     [--stream [--chunk-rows N]]
+       python3 analysis_equipe_05.py results_equipe_05.csv --incremental
+       python3 analysis_equipe_05.py 'logs/*.csv' ../Lab5/ [--jobs N]
+       python3 analysis_equipe_05.py --bench 1000000 --bench 10000000
+
+A .bin file (binary log, see binlog.py) is memory-mapped instead of parsed.
+For a rotated log (hourly/daily partitions + .index.json), only the
+partitions overlapping --from/--to are opened (needs csv_logger.py from Lab 5).
+
+--stream reads the log in chunks of --chunk-rows rows and accumulates the
+statistics in one pass (Partial: count, mean and M2 merged with the
+Welford/Chan update, min/max, last violation counters, status counts):
+same results, memory bounded by the chunk size instead of the log size.
+--incremental also saves the per-file aggregates, with the byte offset
+reached and the file identity (inode, header hash, hash of 16 blocks of 4 KiB
+spread over the bytes before the offset, the last one ending at it), to
+<log>.analysis.json; the next run reads only the rows appended since, so
+re-analyzing a live log costs O(new rows). A truncated,
+rotated or rewritten file is detected and read again in full.
+A CSV is read with an explicit schema (CSV_DTYPES: float32 measurements,
+parsed timestamps, categorical status) by the fastest engine available
+(pyarrow if installed, else the C parser), and the typed table is cached
+next to it (<log>.cache.parquet with pyarrow, else <log>.cache.pkl), keyed
+by the source size and mtime: later analyses of an unchanged file skip the
+CSV parsing. --no-cache reads the CSV without the cache.
+Several paths, glob patterns or directories (Lab 6 results and Lab 5
+sensor_log files, rotated logs grouped through their index) are analyzed
+by a process pool, one file per task. Each worker returns its Partial and
+the parent merges them in a fixed order (partitions of one log in time
+order, violation counters summed across independent logs): exact results
+per file and globally, whatever the number of processes.
+--bench compares the modes (time, peak memory) on synthetic Lab 6 and
+Lab 5 logs and checks that they report the same results (needs
+synthetic.py from Lab 5).
 
 Author: Mohamed-Amine Djelloud
 Course: GTI700 - École de technologie supérieure
 """
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import math
+import numpy as np
 import pandas as pd
+import subprocess
+import sys
+import tempfile
 import time
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+try:
+    import pyarrow  # noqa: F401  (moteur CSV et cache Parquet, optionnel)
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+DATA_FILE = 'results_equipe_05.csv'
+# '%Y-%m-%d %H:%M:%S', avec fraction de seconde (.%f) en mode haute fréquence
+TIMESTAMP_FORMAT = 'ISO8601'
+LAB5_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'     # sensor_log*.csv de demo.py
+# Schéma explicite du journal (timestamp analysé à part)
+CSV_DTYPES = {
+    'temperature': 'float32',
+    'limit_min': 'float32',
+    'limit_max': 'float32',
+    'status': 'category',
+    'violations_min': 'int64',
+    'violations_max': 'int64',
+}
+CACHE_KEY = 'scriptdata.source'
+CHUNK_ROWS = 500000         # lignes par bloc en mode flux
+BENCH_MEMORY_MAX_ROWS = 20000000    # au-delà, le mode en mémoire n'est pas mesuré
+IDENTITY_BLOCKS = 16        # blocs échantillonnés pour l'identité d'un fichier (--incremental)
+IDENTITY_BLOCK = 4096
+
+def data_files(path, start=None, end=None):
+    """Fichiers à lire: le fichier lui-même, ou les partitions qui recouvrent l'intervalle"""
+    if os.path.exists(path + '.index.json'):
+        from csv_logger import partitions_between
+        return partitions_between(path,
+                                  start.timestamp() if start else None,
+                                  end.timestamp() if end else None)
+    return [path] if os.path.exists(path) else []
+
+def load_file(path, use_cache=True):
+    """Charger un fichier: CSV (typé, via le cache colonnaire) ou binaire (projection mémoire)"""
+    if path.endswith('.bin'):
+        import binlog
+        return binlog.to_dataframe(binlog.read_log(path))
+    if not use_cache:
+        return read_typed(path)
+    key = source_key(path)
+    df = read_cache(cache_path(path), key)
+    if df is None:
+        df = read_typed(path)
+        write_cache(cache_path(path), df, key)
+    return df
+
+def csv_engine():
+    """Moteur read_csv le plus rapide disponible (pyarrow, sinon C)"""
+    return 'pyarrow' if HAVE_PYARROW else 'c'
+
+def read_typed(path):
+    """CSV -> DataFrame au schéma explicite (CSV_DTYPES, horodatages analysés)
+
+    Un sensor_log du Lab 5 est converti (normalize), comme en mode flux.
+    """
+    lenient = {column: dtype for column, dtype in CSV_DTYPES.items() if dtype != 'int64'}
+    try:
+        df = pd.read_csv(path, dtype=CSV_DTYPES, engine=csv_engine())
+    except (ValueError, TypeError):
+        # Valeurs non numériques: lecture permissive, puis conversion
+        df = pd.read_csv(path)
+        if 'temperature_thermistor' not in df.columns:
+            df = coerce(df).astype(lenient)
+    if 'temperature_thermistor' in df.columns:
+        # horodatages déjà analysés par normalize
+        return normalize(df).astype(lenient)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format=TIMESTAMP_FORMAT, errors='coerce')
+    return df
+
+def cache_path(path):
+    """Cache colonnaire typé d'un CSV: Parquet (pyarrow), sinon pickle pandas"""
+    return path + ('.cache.parquet' if HAVE_PYARROW else '.cache.pkl')
+
+def source_key(path):
+    """Clé du cache: taille et date de modification du CSV source"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def read_cache(cache, key):
+    """DataFrame en cache, ou None s'il manque ou ne correspond plus au CSV"""
+    if not os.path.exists(cache):
+        return None
+    try:
+        if HAVE_PYARROW:
+            import pyarrow.parquet as pq
+            metadata = pq.read_schema(cache).metadata or {}
+            if json.loads(metadata.get(CACHE_KEY.encode(), b'null')) != key:
+                return None
+            return pq.read_table(cache).to_pandas()
+        df = pd.read_pickle(cache)
+        return df if df.attrs.get(CACHE_KEY) == key else None
+    except Exception as e:
+        print(f"⚠️ Cache illisible ({cache}): {e}")
+        return None
+
+def write_cache(cache, df, key):
+    """Écrire le cache (fichier temporaire puis renommage); une erreur n'arrête pas l'analyse"""
+    tmp = cache + '.tmp'
+    try:
+        if HAVE_PYARROW:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[CACHE_KEY.encode()] = json.dumps(key).encode()
+            pq.write_table(table.replace_schema_metadata(metadata), tmp)
+        else:
+            df.attrs[CACHE_KEY] = key
+            df.to_pickle(tmp)
+        os.replace(tmp, cache)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Cache non écrit ({cache}): {e}")
+
+def normalize(df):
+    """Bloc CSV -> colonnes du journal Lab 6 (un sensor_log du Lab 5 est converti)"""
+    if 'temperature_thermistor' not in df.columns:
+        return coerce(df)
+    # demo.py (Lab 5): thermistance seule, 0 = capteur en erreur; ni limites ni statut
+    temperature = pd.to_numeric(df['temperature_thermistor'], errors='coerce')
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(df['timestamp'], format=LAB5_TIMESTAMP_FORMAT, errors='coerce'),
+        'temperature': temperature.where(temperature != 0),
+        'limit_min': np.nan,
+        'limit_max': np.nan,
+        'status': pd.Series(np.nan, index=df.index, dtype=object),
+        'violations_min': 0,
+        'violations_max': 0,
+    })
+
+def coerce(df):
+    """Convertir les colonnes numériques (au cas où)"""
+    for column in ('temperature', 'limit_max', 'limit_min'):
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, offset=0, end=None):
+    """Blocs de chunk_rows mesures d'un fichier (mémoire bornée)
+
+    offset/end: octets de début et de fin (mesures complètes, voir
+    complete_end), pour ne relire que la fin d'un journal.
+    """
+    if path.endswith('.bin'):
+        import binlog
+        records = binlog.read_log(path)
+        first = max(offset - binlog.HEADER_SIZE, 0) // binlog.DTYPE.itemsize
+        last = len(records) if end is None else (end - binlog.HEADER_SIZE) // binlog.DTYPE.itemsize
+        for i in range(first, last, chunk_rows):
+            yield binlog.to_dataframe(records[i:min(i + chunk_rows, last)])
+        return
+    if not offset and end is None:
+        with pd.read_csv(path, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield normalize(chunk)
+        return
+    with open(path, 'rb') as file:
+        columns = file.readline().decode().strip().split(',')
+        offset = max(offset, file.tell())
+        if end is not None and end <= offset:
+            return
+        file.seek(offset)
+        window = _Window(file, None if end is None else end - offset)
+        with pd.read_csv(window, header=None, names=columns, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield normalize(chunk)
+
+class _Window:
+    # Fichier vu à partir de sa position courante, limité à `size` octets
+    def __init__(self, file, size):
+        self.file = file
+        self.left = size
+
+    def read(self, n=-1):
+        if self.left is None:
+            return self.file.read(n)
+        n = self.left if n is None or n < 0 else min(n, self.left)
+        data = self.file.read(n)
+        self.left -= len(data)
+        return data
+
+def complete_end(path):
+    """Octet qui suit la dernière mesure complète (une ligne en cours d'écriture est exclue)"""
+    size = os.path.getsize(path)
+    if path.endswith('.bin'):
+        import binlog
+        return binlog.HEADER_SIZE + max(size - binlog.HEADER_SIZE, 0) // binlog.DTYPE.itemsize \
+            * binlog.DTYPE.itemsize
+    with open(path, 'rb') as file:
+        pos = size
+        while pos > 0:
+            step = min(pos, 65536)
+            file.seek(pos - step)
+            newline = file.read(step).rfind(b'\n')
+            if newline >= 0:
+                return pos - step + newline + 1
+            pos -= step
+    return 0
+
+def describe_files(files):
+    kind = "binaire (projection mémoire)" if files[0].endswith('.bin') else "CSV"
+    print(f"📂 Lecture de {len(files)} fichier(s) {kind}...")
+
+def load_data(files, start=None, end=None, use_cache=True):
+    """Concaténer les fichiers et garder les mesures de [start, end)"""
+    describe_files(files)
+    df = pd.concat([load_file(path, use_cache) for path in files], ignore_index=True)
+    if len(files) > 1:
+        # catégories différentes d'un fichier à l'autre: la concaténation donne des objets
+        df['status'] = df['status'].astype('category')
+    return select(df, start, end)
+
+def select(df, start=None, end=None):
+    """Mesures de [start, end)"""
+    if start is None and end is None:
+        return df
+    times = df['timestamp']
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, format=TIMESTAMP_FORMAT)
+    keep = pd.Series(True, index=df.index)
+    if start is not None:
+        keep &= times >= start
+    if end is not None:
+        keep &= times < end
+    return df[keep].reset_index(drop=True)
+
+class Partial:
+    """Agrégats fusionnables d'un ensemble de mesures (une passe, mémoire constante)
+
+    La moyenne et l'écart-type sont cumulés sous forme (n, moyenne, M2),
+    fusionnés avec la mise à jour de Welford généralisée aux blocs (Chan):
+    numériquement stable, même pour des centaines de millions de mesures.
+    """
+
+    def __init__(self):
+        self.rows = 0               # mesures (y compris températures invalides)
+        self.count = 0              # températures valides
+        self.mean = 0.0
+        self.m2 = 0.0               # somme des carrés des écarts à la moyenne
+        self.temp_min = math.nan
+        self.temp_max = math.nan
+        self.limit_max = math.nan
+        self.limit_min = math.nan
+        self.violations_min = 0     # compteurs cumulés de la dernière mesure
+        self.violations_max = 0
+        self.status_counts = {}
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        part = cls()
+        part.__dict__.update(data)
+        return part
+
+    @classmethod
+    def from_frame(cls, df):
+        """Agrégats d'un bloc de mesures"""
+        part = cls()
+        if df.empty:
+            return part
+        temps = df['temperature'].to_numpy(dtype=np.float64)
+        temps = temps[~np.isnan(temps)]
+        part.rows = len(df)
+        part.count = len(temps)
+        if part.count:
+            part.mean = float(temps.mean())
+            part.m2 = float(np.square(temps - part.mean).sum())
+            part.temp_min = float(temps.min())
+            part.temp_max = float(temps.max())
+        part.limit_max = float(df['limit_max'].max())
+        part.limit_min = float(df['limit_min'].min())
+        part.violations_min = df['violations_min'].iloc[-1].item()
+        part.violations_max = df['violations_max'].iloc[-1].item()
+        part.status_counts = {status: int(count) for status, count in df['status'].value_counts().items()}
+        return part
+
+    def merge(self, other, independent=False):
+        """Ajouter les agrégats des mesures qui suivent (other)
 
-def analyze_data():
-    """Analyser les données du fichier CSV avec Pandas"""
+        Les compteurs de violations sont cumulés dans le journal: ceux de la
+        dernière mesure sont gardés, sauf si other vient d'un autre journal
+        (independent: autre exécution ou autre appareil), où ils s'ajoutent.
+        """
+        if not other.rows:
+            return self
+        n = self.count + other.count
+        if n:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / n
+            self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.rows += other.rows
+        self.temp_min = float(np.fmin(self.temp_min, other.temp_min))
+        self.temp_max = float(np.fmax(self.temp_max, other.temp_max))
+        self.limit_max = float(np.fmax(self.limit_max, other.limit_max))
+        self.limit_min = float(np.fmin(self.limit_min, other.limit_min))
+        if independent:
+            self.violations_min += other.violations_min
+            self.violations_max += other.violations_max
+        else:
+            self.violations_min = other.violations_min
+            self.violations_max = other.violations_max
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+        return self
+
+    @property
+    def std(self):
+        """Écart-type de l'échantillon (ddof=1, comme pandas)"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def results(self, temps_execution):
+        return {
+            'temp_moyenne': self.mean if self.count else math.nan,
+            'limite_max': self.limit_max,
+            'limite_min': self.limit_min,
+            'violations_inf': self.violations_min,
+            'violations_sup': self.violations_max,
+            'temps_execution': temps_execution,
+            'total_mesures': self.rows,
+            'temp_min_mesuree': self.temp_min,
+            'temp_max_mesuree': self.temp_max,
+            'ecart_type': self.std
+        }
+
+def scan(files, start=None, end=None, chunk_rows=CHUNK_ROWS):
+    """Parcourir les fichiers bloc par bloc et cumuler les agrégats"""
+    describe_files(files)
+    total = Partial()
+    for path in files:
+        for chunk in iter_chunks(path, chunk_rows):
+            total.merge(Partial.from_frame(select(chunk, start, end)))
+    return total
+
+def state_path(path):
+    """Agrégats sauvegardés de l'analyse incrémentale: <journal>.analysis.json"""
+    return path + '.analysis.json'
+
+def identity(path, offset):
+    """Identité d'un fichier analysé jusqu'à `offset`: inode, en-tête, échantillon avant offset
+
+    Échantillon: IDENTITY_BLOCKS blocs répartis sur [0, offset), le dernier
+    finissant à offset (tout le début s'il est plus court); coût constant.
+    """
+    stat = os.stat(path)
+    sample = hashlib.sha1()
+    with open(path, 'rb') as file:
+        header = file.read(16) if path.endswith('.bin') else file.readline()
+        if offset <= IDENTITY_BLOCKS * IDENTITY_BLOCK:
+            file.seek(0)
+            sample.update(file.read(offset))
+        else:
+            step = (offset - IDENTITY_BLOCK) / (IDENTITY_BLOCKS - 1)
+            for i in range(IDENTITY_BLOCKS):
+                file.seek(round(i * step))
+                sample.update(file.read(IDENTITY_BLOCK))
+    return {
+        'inode': [stat.st_dev, stat.st_ino],
+        'header': hashlib.sha1(header).hexdigest(),
+        'sample': sample.hexdigest(),
+    }
+
+def scan_incremental(path, files, chunk_rows=CHUNK_ROWS):
+    """Agrégats de tout le journal en ne lisant que les mesures ajoutées depuis la dernière analyse
+
+    Par fichier, les agrégats sont sauvegardés avec l'octet atteint et
+    l'identité du fichier. Un fichier tronqué, remplacé (rotation, nouvel
+    inode) ou réécrit est relu en entier.
+    """
+    from checkpoint import Checkpoint
+    describe_files(files)
+    checkpoint = Checkpoint(state_path(path), interval=0)
+    saved = checkpoint.load() or {}
+    state = {}
+    total = Partial()
+    new_rows = 0
+    for name in files:
+        entry = saved.get(os.path.abspath(name))
+        end = complete_end(name)
+        offset = 0
+        part = Partial()
+        if entry is not None:
+            if entry['offset'] <= end and identity(name, entry['offset']) == entry['identity']:
+                offset = entry['offset']
+                part = Partial.from_dict(entry['partial'])
+            else:
+                print(f"🔄 {name}: fichier tronqué ou remplacé, analyse complète")
+        before = part.rows
+        for chunk in iter_chunks(name, chunk_rows, offset, end):
+            part.merge(Partial.from_frame(chunk))
+        new_rows += part.rows - before
+        state[os.path.abspath(name)] = {'offset': end, 'identity': identity(name, end),
+                                        'partial': part.to_dict()}
+        total.merge(part)
+    checkpoint.save(state)
+    print(f"♻️ Analyse incrémentale: {new_rows} nouvelle(s) mesure(s), "
+          f"{total.rows - new_rows} déjà analysée(s)")
+    return total
+
+def expand_inputs(patterns, start=None, end=None):
+    """Journaux désignés par des chemins, motifs glob ou dossiers: [(nom, [fichiers])]
+
+    Un journal partitionné (index .index.json) est un seul journal, ses
+    partitions dans l'ordre; les autres .csv/.bin sont chacun un journal.
+    """
+    logs = []
+    grouped = set()
+    singles = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            names = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))]
+        else:
+            names = sorted(glob.glob(pattern)) or [pattern]
+        for name in names:
+            if name.endswith('.index.json'):
+                name = name[:-len('.index.json')]
+            if os.path.exists(name + '.index.json'):
+                if os.path.abspath(name) not in {os.path.abspath(log) for log, _ in logs}:
+                    files = data_files(name, start, end)
+                    logs.append((name, files))
+                    grouped.update(os.path.abspath(f) for f in files)
+            elif name.endswith(('.csv', '.bin')) and os.path.isfile(name):
+                singles.append(name)
+    # les partitions déjà rattachées à leur journal ne sont pas comptées deux fois
+    for name in singles:
+        path = os.path.abspath(name)
+        if path not in grouped:
+            logs.append((name, [name]))
+            grouped.add(path)
+    return logs
+
+def analyze_file(path, start=None, end=None, chunk_rows=CHUNK_ROWS):
+    """Agrégats d'un fichier (exécuté dans un processus du pool)"""
+    total = Partial()
+    for chunk in iter_chunks(path, chunk_rows):
+        total.merge(Partial.from_frame(select(chunk, start, end)))
+    return total
+
+def analyze_many(patterns, start=None, end=None, jobs=None, chunk_rows=CHUNK_ROWS):
+    """Analyser plusieurs journaux en parallèle: (résultats globaux, {fichier: résultats})
+
+    Chaque fichier est lu par un processus du pool, qui renvoie ses agrégats
+    (Partial); le processus principal les fusionne dans un ordre fixe,
+    partitions d'un journal à la suite puis journaux entre eux: le résultat
+    ne dépend ni du nombre de processus ni de l'ordre de fin des tâches.
+    """
+    print("📊 DÉMARRAGE DE L'ANALYSE DES DONNÉES (plusieurs journaux)")
+    print("=" * 40)
+    start_time = time.time()
+    logs = expand_inputs(patterns, start, end)
+    files = [f for _, log_files in logs for f in log_files]
+    if not files:
+        print(f"❌ ERREUR: Aucun journal trouvé pour {' '.join(patterns)}")
+        return None, {}
+    jobs = min(jobs or os.cpu_count() or 1, len(files))
+    print(f"📂 {len(logs)} journal(aux), {len(files)} fichier(s), {jobs} processus...")
+
+    partials = {}
+    if jobs == 1:
+        for f in files:
+            try:
+                partials[f] = analyze_file(f, start, end, chunk_rows)
+            except Exception as e:
+                print(f"⚠️ {f} ignoré: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(analyze_file, f, start, end, chunk_rows): f for f in files}
+            for future in as_completed(futures):
+                try:
+                    partials[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"⚠️ {futures[future]} ignoré: {e}")
+
+    total = Partial()
+    for _, log_files in logs:
+        log_total = Partial()
+        for f in log_files:
+            if f in partials:
+                log_total.merge(partials[f])
+        total.merge(log_total, independent=True)
+    elapsed = time.time() - start_time
+    per_file = {f: partials[f].results(elapsed) for f in files if f in partials}
+
+    print("\n📁 RÉSULTATS PAR FICHIER")
+    print(f"   {'mesures':>9} {'moyenne':>8} {'écart-type':>10} {'min':>7} {'max':>7} "
+          f"{'viol. bas/haut':>15}  fichier")
+    for f, r in per_file.items():
+        print(f"   {r['total_mesures']:9d} {r['temp_moyenne']:8.2f} {r['ecart_type']:10.2f} "
+              f"{r['temp_min_mesuree']:7.2f} {r['temp_max_mesuree']:7.2f} "
+              f"{r['violations_inf']:>7}/{r['violations_sup']:<7}  {f}")
+    if not total.rows:
+        print("❌ ERREUR: Aucune mesure (fichiers vides ou intervalle sans données)!")
+        return None, per_file
+    results = total.results(time.time() - start_time)
+    report(results, total.status_counts)
+    return results, per_file
+
+def analyze_data(path=DATA_FILE, start=None, end=None, stream=False, chunk_rows=CHUNK_ROWS,
+                 incremental=False, use_cache=True):
+    """Analyser les données du fichier CSV avec Pandas (en entier, ou par blocs si stream)"""
     
     print("📊 DÉMARRAGE DE L'ANALYSE DES DONNÉES")
     print("=" * 40)
     
     start_time = time.time()
     
-    # Vérifier que le fichier existe
-    if not os.path.exists('results_equipe_05.csv'):
-        print("❌ ERREUR: Le fichier 'results_equipe_xx.csv' n'existe pas!")
+    # Vérifier que le fichier existe (ou ses partitions dans l'intervalle)
+    files = data_files(path, start, end)
+    if not files:
+        print(f"❌ ERREUR: Le fichier '{path}' n'existe pas (ou aucune partition dans l'intervalle)!")
         print("💡 Assurez-vous d'avoir exécuté le script principal d'abord.")
         return None
     
     try:
-        # Lire le fichier CSV
-        print("📂 Lecture du fichier CSV...")
-        df = pd.read_csv('results_equipe_05.csv')
+        if incremental and (start is not None or end is not None):
+            print("⚠️ --incremental ignoré avec --from/--to: analyse complète par blocs")
+            incremental = False
+        if stream or incremental:
+            # Mode flux: un bloc à la fois, agrégats cumulés en une passe
+            # (incrémental: seulement les mesures ajoutées depuis la dernière analyse)
+            if incremental:
+                total = scan_incremental(path, files, chunk_rows)
+            else:
+                total = scan(files, start, end, chunk_rows)
+            if not total.rows:
+                print("❌ ERREUR: Aucune mesure (fichier vide ou intervalle sans données)!")
+                return None
+            print(f"✅ Données lues par blocs de {chunk_rows}: {total.rows} enregistrements")
+            print("🔢 Calcul des statistiques...")
+            results = total.results(time.time() - start_time)
+            report(results, total.status_counts)
+            return results
+
+        # Lire le(s) fichier(s) (CSV ou binaire)
+        df = load_data(files, start, end, use_cache)
         
         # Vérifier que le fichier n'est pas vide
         if df.empty:
-            print("❌ ERREUR: Le fichier CSV est vide!")
+            print("❌ ERREUR: Aucune mesure (fichier vide ou intervalle sans données)!")
             return None
         
         print(f"✅ Données chargées: {len(df)} enregistrements")
         
-        # Convertir la colonne température en numérique (au cas où)
-        df['temperature'] = pd.to_numeric(df['temperature'], errors='coerce')
-        df['limit_max'] = pd.to_numeric(df['limit_max'], errors='coerce')
-        df['limit_min'] = pd.to_numeric(df['limit_min'], errors='coerce')
-        
         # Calculer les statistiques demandées
         print("🔢 Calcul des statistiques...")
         
+        # Colonnes stockées en float32, statistiques calculées en float64
+        temperature = df['temperature'].astype(np.float64)
+        
         # i) Température moyenne
-        temp_moyenne = df['temperature'].mean()
+        temp_moyenne = temperature.mean()
         
         # ii) Limite maximale définie (la plus haute valeur atteinte)
-        limite_max_definie = df['limit_max'].max()
+        limite_max_definie = np.float64(df['limit_max'].max())
         
         # iii) Limite minimale définie (la plus basse valeur atteinte)
-        limite_min_definie = df['limit_min'].min()
+        limite_min_definie = np.float64(df['limit_min'].min())
         
         # iv) Nombre de violations limite inférieure (dernière valeur)
         violations_inf = df['violations_min'].iloc[-1] if len(df) > 0 else 0
@@ -74,33 +638,6 @@ def analyze_data():
         end_time = time.time()
         temps_execution = end_time - start_time
         
-        # Afficher les résultats
-        print("\n" + "=" * 50)
-        print("📊 RÉSULTATS DE L'ANALYSE")
-        print("=" * 50)
-        print(f"i)   Température moyenne: {temp_moyenne:.2f}°C")
-        print(f"ii)  Limite maximale définie: {limite_max_definie:.1f}°C")
-        print(f"iii) Limite minimale définie: {limite_min_definie:.1f}°C")
-        print(f"iv)  Violations limite inférieure: {violations_inf}")
-        print(f"v)   Violations limite supérieure: {violations_sup}")
-        print(f"vi)  Temps d'exécution du script: {temps_execution:.6f} secondes")
-        print("=" * 50)
-        
-        # Statistiques supplémentaires utiles
-        print("\n📈 STATISTIQUES SUPPLÉMENTAIRES:")
-        print(f"🌡️  Température min mesurée: {df['temperature'].min():.2f}°C")
-        print(f"🌡️  Température max mesurée: {df['temperature'].max():.2f}°C")
-        print(f"📊 Écart-type température: {df['temperature'].std():.2f}°C")
-        print(f"🚨 Total violations: {violations_inf + violations_sup}")
-        print(f"📏 Nombre total de mesures: {len(df)}")
-        
-        # Distribution des statuts
-        print(f"\n📋 DISTRIBUTION DES STATUTS:")
-        status_counts = df['status'].value_counts()
-        for status, count in status_counts.items():
-            percentage = (count / len(df)) * 100
-            print(f"   {status}: {count} fois ({percentage:.1f}%)")
-        
         # Retourner les résultats pour d'éventuels traitements supplémentaires
         results = {
             'temp_moyenne': temp_moyenne,
@@ -110,12 +647,12 @@ def analyze_data():
             'violations_sup': violations_sup,
             'temps_execution': temps_execution,
             'total_mesures': len(df),
-            'temp_min_mesuree': df['temperature'].min(),
-            'temp_max_mesuree': df['temperature'].max(),
-            'ecart_type': df['temperature'].std()
+            'temp_min_mesuree': temperature.min(),
+            'temp_max_mesuree': temperature.max(),
+            'ecart_type': temperature.std()
         }
-        
-        print(f"\n✅ Analyse terminée en {temps_execution:.6f} secondes")
+        status_counts = df['status'].value_counts()
+        report(results, status_counts[status_counts > 0])
         
         return results
         
@@ -129,6 +666,39 @@ def analyze_data():
         print(f"❌ ERREUR inattendue: {e}")
         return None
 
+def report(results, status_counts):
+    """Afficher les résultats (et la distribution des statuts)"""
+    print("\n" + "=" * 50)
+    print("📊 RÉSULTATS DE L'ANALYSE")
+    print("=" * 50)
+    print(f"i)   Température moyenne: {results['temp_moyenne']:.2f}°C")
+    print(f"ii)  Limite maximale définie: {results['limite_max']:.1f}°C")
+    print(f"iii) Limite minimale définie: {results['limite_min']:.1f}°C")
+    print(f"iv)  Violations limite inférieure: {results['violations_inf']}")
+    print(f"v)   Violations limite supérieure: {results['violations_sup']}")
+    print(f"vi)  Temps d'exécution du script: {results['temps_execution']:.6f} secondes")
+    print("=" * 50)
+    
+    # Statistiques supplémentaires utiles
+    print("\n📈 STATISTIQUES SUPPLÉMENTAIRES:")
+    print(f"🌡️  Température min mesurée: {results['temp_min_mesuree']:.2f}°C")
+    print(f"🌡️  Température max mesurée: {results['temp_max_mesuree']:.2f}°C")
+    print(f"📊 Écart-type température: {results['ecart_type']:.2f}°C")
+    print(f"🚨 Total violations: {results['violations_inf'] + results['violations_sup']}")
+    print(f"📏 Nombre total de mesures: {results['total_mesures']}")
+    
+    # Distribution des statuts (les plus fréquents d'abord)
+    print(f"\n📋 DISTRIBUTION DES STATUTS:")
+    for status, count in sorted(dict(status_counts).items(), key=lambda item: -item[1]):
+        percentage = (count / results['total_mesures']) * 100
+        print(f"   {status}: {count} fois ({percentage:.1f}%)")
+    missing = results['total_mesures'] - sum(dict(status_counts).values())
+    if missing > 0:
+        # sensor_log du Lab 5 (pas de limites), ou statut illisible
+        print(f"   sans statut: {missing} fois ({missing / results['total_mesures'] * 100:.1f}%)")
+    
+    print(f"\n✅ Analyse terminée en {results['temps_execution']:.6f} secondes")
+
 def save_analysis_results(results):
     """Sauvegarder les résultats d'analyse dans un fichier"""
     if results is None:
@@ -151,13 +721,87 @@ def save_analysis_results(results):
     except Exception as e:
         print(f"❌ Erreur sauvegarde résultats: {e}")
 
+def run_child(args, cwd):
+    """Analyse dans un sous-processus: (durée en s, pic mémoire en Mo, code de sortie)"""
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, os.path.abspath(__file__)] + args,
+                             cwd=cwd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(child.pid, 0)
+    child.returncode = os.waitstatus_to_exitcode(status)
+    return time.perf_counter() - start, usage.ru_maxrss / 1024, child.returncode
+
+def bench(sizes, directory=None):
+    """Comparer l'analyse en flux, en mémoire et depuis le cache sur des journaux synthétiques"""
+    from synthetic import write_csv
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        path = os.path.join(tmp, 'results.csv')
+        saved = os.path.join(tmp, 'analysis_results_equipe_05.txt')
+        # journal Lab 6, puis sensor_log du Lab 5 (converti par normalize)
+        for rows, kind in itertools.product(sizes, ('lab6', 'lab5')):
+            start = time.perf_counter()
+            written = write_csv(path, kind, rows, seed=1)
+            print(f"📝 {written} mesures ({kind}): CSV {os.path.getsize(path) / 1e6:.0f} Mo "
+                  f"(généré en {time.perf_counter() - start:.0f} s)")
+            reports = {}
+            modes = (('flux', ['--stream']), ('mémoire', ['--no-cache']),
+                     ('cache (création)', []), ('cache', []))
+            for mode, extra in modes:
+                if extra != ['--stream'] and rows > BENCH_MEMORY_MAX_ROWS:
+                    print(f"   {mode:17} non mesuré (plus de {BENCH_MEMORY_MAX_ROWS} mesures)")
+                    continue
+                elapsed, peak, code = run_child([path] + extra, tmp)
+                line = f"   {mode:17} {elapsed:8.1f} s   pic mémoire {peak:7.0f} Mo"
+                if code != 0:
+                    line += f"   (échec, code {code})"
+                elif os.path.exists(saved):
+                    with open(saved) as file:
+                        reports[mode] = [l for l in file if not l.startswith("Temps d'exécution")]
+                print(line)
+            if len(reports) > 1:
+                same = all(lines == reports['flux'] for lines in reports.values())
+                print(f"   résultats {'identiques' if same else 'DIFFÉRENTS'}")
+
 if __name__ == '__main__':
     print("🐍 SCRIPT D'ANALYSE PANDAS")
     print("Analyseur de données de température IoT")
     print("-" * 40)
     
-    # Exécuter l'analyse
-    results = analyze_data()
+    parser = argparse.ArgumentParser(description="Analyse des mesures de température")
+    parser.add_argument('paths', nargs='*', default=[DATA_FILE], metavar='path',
+                        help="journal CSV/binaire (ou nom de base d'un journal partitionné); "
+                             "plusieurs chemins, motifs ('logs/*.csv') ou dossiers: analyse en parallèle")
+    parser.add_argument('--from', dest='start', type=datetime.fromisoformat,
+                        help="début de l'intervalle, heure locale (ex. '2025-07-04 14:00')")
+    parser.add_argument('--to', dest='end', type=datetime.fromisoformat,
+                        help="fin de l'intervalle (exclue)")
+    parser.add_argument('--stream', action='store_true',
+                        help="lecture par blocs, mémoire bornée (mêmes résultats)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="ne lire que les mesures ajoutées depuis la dernière analyse "
+                             "(agrégats dans <journal>.analysis.json)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help="relire le CSV sans utiliser ni écrire le cache colonnaire")
+    parser.add_argument('--jobs', type=int,
+                        help="processus pour plusieurs journaux (défaut: nombre de cœurs)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help="mesures par bloc en mode flux")
+    parser.add_argument('--bench', type=int, action='append', metavar='ROWS',
+                        help="comparer les modes sur un journal synthétique de ROWS mesures")
+    parser.add_argument('--bench-dir', help="dossier des journaux de test (défaut: temporaire)")
+    args = parser.parse_args()
+    
+    if args.bench:
+        bench(args.bench, args.bench_dir)
+        raise SystemExit(0)
+    
+    # Exécuter l'analyse (un journal, ou plusieurs en parallèle)
+    single = args.paths[0]
+    if (len(args.paths) > 1 or args.jobs or os.path.isdir(single)
+            or glob.has_magic(single)):
+        results, _ = analyze_many(args.paths, args.start, args.end, args.jobs, args.chunk_rows)
+    else:
+        results = analyze_data(single, args.start, args.end, args.stream, args.chunk_rows,
+                               args.incremental, args.cache)
     
     # Optionnel: sauvegarder les résultats
     if results:
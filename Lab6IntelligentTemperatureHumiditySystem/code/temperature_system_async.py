@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+GTI700 Lab 6 - Intelligent Temperature Monitoring System (asyncio)
+Team: Équipe 05
+
+Same behaviour as temperature_system_final.py, but each stage runs as an
+independent asyncio task instead of one sequential loop:
+- Sensing: thermistor (channel 3, oversampled burst) every 2 seconds,
+  limits check
+- Joystick: channels 0,1,2 polled at 20 Hz (one frame per poll), limits
+  adjusted only on debounced direction-change and auto-repeat events
+- Logging: CSV rows queued to the shared csv_logger writer thread, so a
+  slow SD card write no longer stalls sampling
+- Reporting: periodic statistics
+
+Bus reads go through adc_async.AsyncADC (one dedicated I2C thread).
+
+Usage: python3 temperature_system_async.py
+"""
+import PCF8591 as ADC
+import RPi.GPIO as GPIO
+import asyncio
+import time
+
+from adc_async import AsyncADC
+import temperature_system_final as system
+
+# Configuration des tâches
+MEASURE_INTERVAL = 2.0    # secondes entre deux mesures
+JOYSTICK_RATE_HZ = 20     # fréquence de lecture du joystick
+REPORT_EVERY = 10         # statistiques toutes les N mesures
+
+async def sensing_task(adc, stats):
+    """Acquisition température, vérification des limites"""
+    deadline = time.monotonic()
+    while True:
+        stats['mesures'] += 1
+        print(f"\n📏 Mesure #{stats['mesures']}")
+
+        try:
+            burst = await adc.read_burst(3, system.OVERSAMPLE_N)
+        except OSError as e:
+            # erreur I2C: même repli que le moniteur séquentiel
+            temp = system.fallback_temperature(e)
+        else:
+            temp = system.get_temperature(system.oversampler.decimate(burst)['value'])
+        status = system.check_temperature_limits(temp)
+        stats['temperature'] = temp
+
+        # Ligne construite maintenant (limites et compteurs de cette mesure)
+        system.save_to_csv(temp, status)
+        if system.checkpoint.due():
+            system.save_checkpoint(stats['mesures'])
+
+        deadline += MEASURE_INTERVAL
+        await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+
+async def joystick_task(adc):
+    """Ajustement des limites au joystick, sur événements seulement"""
+    joystick = system.joystick
+    failed = 0    # trames illisibles consécutives
+    while True:
+        try:
+            async for frame in adc.stream(joystick.channels, rate_hz=JOYSTICK_RATE_HZ):
+                failed = 0
+                # Changement de direction (anti-rebond) ou répétition d'une direction maintenue
+                event = joystick.update(frame)
+                if event is not None and event.direction != 'home':
+                    system.apply_joystick_direction(event.direction)
+        except OSError as e:
+            # trame illisible (erreur I2C): ignorée, le flux reprend à la
+            # période suivante; un seul message par série d'erreurs
+            failed += 1
+            if failed == 1:
+                print(f"⚠️ Erreur lecture joystick: {e}")
+            await asyncio.sleep(1.0 / JOYSTICK_RATE_HZ)
+
+async def reporting_task(stats):
+    """Affichage périodique des statistiques"""
+    while True:
+        await asyncio.sleep(MEASURE_INTERVAL * REPORT_EVERY)
+        if stats['temperature'] is None:
+            continue
+        print(f"\n📈 STATISTIQUES (après {stats['mesures']} mesures):")
+        print(f"   🚨 Total violations: {system.probe.violations}")
+        print(f"   📊 Température actuelle: {stats['temperature']:.1f}°C")
+        print(f"   ⚙️ Limites: {system.probe.temp_min:.1f}°C - {system.probe.temp_max:.1f}°C")
+
+async def run(stats):
+    async with AsyncADC() as adc:
+        tasks = [
+            asyncio.create_task(sensing_task(adc, stats)),
+            asyncio.create_task(joystick_task(adc)),
+            asyncio.create_task(reporting_task(stats)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+def main():
+    """Fonction principale du système"""
+    print("🚀 DÉMARRAGE DU SYSTÈME DE TEMPÉRATURE INTELLIGENT (asyncio)")
+    print("=" * 60)
+
+    print("🔧 Initialisation...")
+    ADC.setup(0x48)
+    GPIO.setmode(GPIO.BCM)
+    system.joystick.calibrate()
+    print("✅ Système initialisé")
+
+    # Reprise: limites et compteurs du dernier point de reprise, avant
+    # d'ouvrir le journal (les mesures sont ajoutées à la fin)
+    stats = {'mesures': system.resume_from_checkpoint(), 'temperature': None}
+
+    if not system.create_csv_headers():
+        print("❌ Impossible de créer le fichier CSV. Arrêt.")
+        return
+
+    system.display_instructions()
+
+    try:
+        print("\n🏁 DÉBUT DES MESURES:")
+        print("-" * 30)
+        asyncio.run(run(stats))
+
+    except KeyboardInterrupt:
+        print("\n\n🛑 ARRÊT DU SYSTÈME DEMANDÉ")
+
+    except Exception as e:
+        print(f"\n❌ ERREUR SYSTÈME: {e}")
+
+    finally:
+        system.csv_log.close()
+        system.save_checkpoint(stats['mesures'])
+        system.final_report(stats['mesures'])
+
+        print("🧹 Nettoyage des ressources...")
+        GPIO.cleanup()
+        print("✅ Système arrêté proprement")
+        print("\n💡 Prochaine étape: Analysez vos données avec le script Pandas!")
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,12 @@ This system implements:
 - Intelligent alert system with violation tracking
 - CSV data logging for analysis
 - PCF8591 ADC integration for sensor interfacing
+- Optional high-frequency mode (LAB6_RATE_HZ=10..500) for fast transients
+- Crash-safe checkpoints: limits and counters resume after a restart and
+  the log is appended to, never truncated
+
+Limits, counters and log of the thermistor live in a SensorMonitor
+(monitor.py); monitor.py also runs many probes on several boards.
 
 Hardware Requirements:
 - Raspberry Pi 4
@@ -23,182 +29,302 @@ Course: GTI700 - École de technologie supérieure
 import PCF8591 as ADC
 import RPi.GPIO as GPIO
 import time
-import math
-import csv
-from datetime import datetime
+import collections
+import os
+import queue
+import threading
+from binlog import BinaryLogger
+from checkpoint import Checkpoint
+from csv_logger import CSVLogger, index_path
+from alerts import AlertEngine, RateLimiter
+from joystick import Joystick
+from monitor import SensorMonitor
+from oversample import Oversampler
+from sampler import Sampler
+from thermistor_model import Thermistor
 
 # Configuration initiale
-temp_min = 20.0  # Limite inférieure (°C)
-temp_max = 30.0  # Limite supérieure (°C)
-violations_min = 0
-violations_max = 0
+TEMP_MIN = 20.0  # Limite inférieure (°C)
+TEMP_MAX = 30.0  # Limite supérieure (°C)
 start_time = time.time()
+CSV_FILE = 'results_equipe_xx.csv'
+BIN_FILE = 'results_equipe_xx.bin'
+# Format du journal: 'csv' (défaut) ou 'bin' (enregistrements binaires de
+# taille fixe, voir binlog.py; convertible en CSV avec binlog.py to-csv)
+LOG_FORMAT = os.environ.get('LAB6_LOG_FORMAT', 'csv')
+LOG_FILE = BIN_FILE if LOG_FORMAT == 'bin' else CSV_FILE
+# Rotation (sur demande): une partition par heure ('hour') ou par jour
+# ('day'), plus un index des plages de temps (LOG_FILE + .index.json) pour
+# les requêtes par intervalle de scriptData; par défaut ('none') un seul
+# fichier, celui qu'attend scriptData; dans tous les cas les mesures sont
+# ajoutées à la fin du journal existant au redémarrage
+LOG_ROTATE = os.environ.get('LAB6_LOG_ROTATE', 'none')
+if LOG_ROTATE == 'none':
+    LOG_ROTATE = None
+CSV_HEADER = ['timestamp', 'temperature', 'limit_min', 'limit_max',
+              'status', 'violations_min', 'violations_max']
+MEASURE_INTERVAL = 2.0    # secondes entre deux mesures (cadence fixe)
+JOYSTICK_RATE_HZ = 20     # fréquence du thread d'entrée joystick
+
+# Mode haute fréquence (LAB6_RATE_HZ=10..500, 0 = mode normal): par mesure,
+# seulement lecture, conversion et seuils; le journal (thread d'écriture),
+# la console et les statistiques sont traités par lots hors de la boucle
+RATE_HZ = float(os.environ.get('LAB6_RATE_HZ', '0'))
+if RATE_HZ and not 10 <= RATE_HZ <= 500:
+    raise SystemExit(f"❌ LAB6_RATE_HZ doit être entre 10 et 500 Hz (reçu {RATE_HZ:g})")
+HF_OVERSAMPLE_N = 4       # rafale courte: ~0.5 ms sur le bus à 100 kHz
+HF_REPORT_INTERVAL = 5.0  # secondes entre deux rapports (cadence, pertes)
+
+# Point de reprise: limites et compteurs sauvegardés atomiquement toutes les
+# 30 s (et à l'arrêt), rechargés au démarrage si le journal existe encore
+CHECKPOINT_FILE = os.path.splitext(LOG_FILE)[0] + '.checkpoint.json'
+checkpoint = Checkpoint(CHECKPOINT_FILE, interval=30.0)
+
+# Échantillonnage en arrière-plan du joystick (canaux 0-2):
+# la boucle principale lit la mémoire au lieu du bus I2C
+sampler = Sampler([0, 1, 2], rate_hz=50)
+
+# Thermistor (canal 3) suréchantillonné: rafale de 16 conversions réduite
+# par moyenne tronquée -> valeur fractionnaire, pics rejetés
+OVERSAMPLE_N = 16
+oversampler = Oversampler(3, n=OVERSAMPLE_N, method='trimmed')
+
+# Joystick: Y (canal 1) haut/bas, X (canal 0) gauche/droite, bouton (canal 2).
+# Seuils relatifs au centre calibré au démarrage, avec hystérésis;
+# une direction maintenue se répète toutes les 0.5 s
+joystick = Joystick(vertical=1, horizontal=0, button=2,
+                    threshold=68, release=50, button_press=50, button_release=80,
+                    repeat_delay=0.5, repeat_interval=0.5)
+
+# Le thread d'entrée publie les événements joystick; la boucle principale
+# les applique entre deux mesures (jamais pendant une mesure)
+joystick_events = queue.Queue(maxsize=64)
+stop_input = threading.Event()
+
+# Journal: fichier gardé ouvert, écriture par lots sur un thread dédié,
+# fsync à chaque vidage (au plus toutes les 10 s); la boucle de mesure
+# attend seulement si la file (10000 lignes) est pleine
+if LOG_FORMAT == 'bin':
+    csv_log = BinaryLogger(BIN_FILE, rotate=LOG_ROTATE,
+                           flush_interval=10.0, fsync='flush', on_full='block')
+else:
+    # mode haute fréquence: horodatage à la microseconde (une ligne par
+    # échéance, sinon ~RATE_HZ lignes partagent la même seconde)
+    csv_log = CSVLogger(CSV_FILE, header=CSV_HEADER, rotate=LOG_ROTATE,
+                        timestamp_format='%Y-%m-%d %H:%M:%S' + ('.%f' if RATE_HZ else ''),
+                        flush_interval=10.0, fsync='flush', on_full='block')
+
+# Modèle du thermistor (Beta 3950, 10 kΩ à 25°C), table précalculée
+thermistor = Thermistor(beta=3950, r0=10000, t0=25)
+
+# Alertes: un épisode commence à la 3e mesure consécutive hors limite (4 s
+# après la première; le seuil de 1.5 intervalle absorbe la gigue de
+# l'échéancier), se termine 0.5°C en deçà de la limite (hystérésis), et un
+# nouvel épisode du même type n'est réannoncé qu'après 60 s; une ligne d'état
+# par mesure (cadence fixe)
+alerts = AlertEngine(hysteresis=0.5, min_duration=1.5 * MEASURE_INTERVAL,
+                     cooldown=60.0, status_interval=0.0)
+
+# La sonde: limites, compteurs de violations et journal
+probe = SensorMonitor('thermistor', 3, temp_min=TEMP_MIN, temp_max=TEMP_MAX,
+                      log=csv_log, model=thermistor, label=False, alerts=alerts)
+
+# Source des valeurs simulées quand le capteur est en erreur (créée au besoin)
+fallback = None
 
 def setup():
     """Initialisation du système"""
     ADC.setup(0x48)
     GPIO.setmode(GPIO.BCM)
+    # Position de repos du joystick (ne pas le toucher au démarrage)
+    joystick.calibrate()
+    sampler.start()
+    stop_input.clear()
+    threading.Thread(target=joystick_input, name='joystick-input', daemon=True).start()
     print("✅ Système initialisé")
 
-def get_temperature():
+def convert_temperature(analogVal):
+    """Conversion valeur ADC (0-255) → température (°C)"""
+    # ValueError aux rails (capteur débranché) ou hors de -10..60°C
+    return probe.convert(analogVal)
+
+def get_temperature(analogVal=None):
     """Lecture température du thermistor (canal 3)"""
     try:
-        # Lecture sur canal 3 pour éviter conflit avec joystick
-        analogVal = ADC.read(3)
-        
-        # Calcul température selon formule du thermistor
-        Vr = 5 * float(analogVal) / 255
-        if Vr >= 5:
-            Vr = 4.99  # Éviter division par zéro
-        
-        Rt = 10000 * Vr / (5 - Vr)
-        if Rt <= 0:
-            raise ValueError("Résistance invalide")
-            
-        temp = 1/(((math.log(Rt / 10000)) / 3950) + (1 / (273.15+25)))
-        temp = temp - 273.15
-        
-        # Vérification cohérence (température raisonnable)
-        if not (-10 <= temp <= 60):
-            raise ValueError(f"Température incohérente: {temp}°C")
-            
-        return temp
+        if analogVal is None:
+            # Canal 3 pour éviter conflit avec joystick (rafale décimée)
+            analogVal = oversampler.read()['value']
+        return convert_temperature(analogVal)
         
     except Exception as e:
-        print(f"⚠️ Erreur capteur température: {e}")
-        # Simulation en cas d'erreur
-        import random
-        return 22.0 + random.uniform(-3, 8)
+        return fallback_temperature(e)
+
+def fallback_temperature(error):
+    """Température de repli après une erreur capteur ou bus"""
+    global fallback
+    print(f"⚠️ Erreur capteur température: {error}")
+    # Simulation en cas d'erreur: charge synthétique à graine fixe, la
+    # même série de valeurs à chaque exécution (synthetic.py)
+    if fallback is None:
+        from synthetic import Synthetic
+        fallback = Synthetic(seed=0, rate_hz=1 / MEASURE_INTERVAL,
+                             spike_rate=0, dropout_rate=0)
+    return float(fallback.generate(1)['temperature'][0])
 
-def get_joystick_direction():
-    """Lecture direction joystick avec seuils adaptatifs"""
+def get_joystick_direction(frame=None):
+    """Lecture direction joystick avec seuils calibrés"""
     try:
-        state = ['home', 'up', 'down', 'left', 'right', 'pressed']
-        
-        # Lecture des canaux joystick
-        joy_x = ADC.read(0)  # Canal X (gauche/droite)
-        joy_y = ADC.read(1)  # Canal Y (haut/bas)
-        joy_btn = ADC.read(2)  # Bouton
-        
-        # Seuils adaptatifs basés sur votre calibration
-        # (Ces valeurs seront ajustées selon votre joystick)
-        
-        # Détection bouton en priorité
-        if joy_btn <= 50:  # Bouton pressé
-            return 'pressed'
-        
-        # Détection directions avec seuils larges pour compatibilité
-        if joy_y <= 60:  # Haut
-            return 'up'
-        elif joy_y >= 195:  # Bas  
-            return 'down'
-        elif joy_x <= 60:  # Droite (peut être inversé selon câblage)
-            return 'right'
-        elif joy_x >= 195:  # Gauche (peut être inversé selon câblage)
-            return 'left'
-        else:
-            return 'home'  # Position centrale
+        # Un seul instantané des canaux joystick: X (gauche/droite), Y (haut/bas), bouton
+        if frame is None:
+            frame = sampler.frame([0, 1, 2])
+        joy_x, joy_y, joy_btn = frame
+        return classify_joystick(joy_x, joy_y, joy_btn)
             
     except Exception as e:
         print(f"⚠️ Erreur joystick: {e}")
         return 'home'
 
+def classify_joystick(joy_x, joy_y, joy_btn):
+    """Direction du joystick à partir des valeurs X, Y et bouton"""
+    # Bouton prioritaire, puis l'axe le plus dévié au-delà du seuil
+    return joystick.classify([joy_y, joy_x, joy_btn])
+
 def check_temperature_limits(temp):
     """Vérifier si température dans les limites définies"""
-    global violations_min, violations_max
-    
-    if temp < temp_min:
-        violations_min += 1
-        print(f"🥶 ALERTE: Température TROP BASSE ({temp:.1f}°C < {temp_min:.1f}°C)")
-        print("   💡 Vous devriez augmenter le thermostat")
-        return "low"
-    elif temp > temp_max:
-        violations_max += 1
-        print(f"🔥 ALERTE: Température TROP ÉLEVÉE ({temp:.1f}°C > {temp_max:.1f}°C)")
-        print("   💡 Vous devriez diminuer le thermostat")
-        return "high"
-    else:
-        print(f"✅ Température NORMALE: {temp:.1f}°C (Limites: {temp_min:.1f}°C - {temp_max:.1f}°C)")
-        return "normal"
+    return probe.check(temp)
 
 def save_to_csv(temp, status):
-    """Sauvegarder les données dans le fichier CSV"""
-    try:
-        with open('results_equipe_xx.csv', 'a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                f"{temp:.2f}",
-                f"{temp_min:.1f}",
-                f"{temp_max:.1f}",
-                status,
-                violations_min,
-                violations_max
-            ])
-    except Exception as e:
-        print(f"❌ Erreur sauvegarde CSV: {e}")
+    """Sauvegarder les données dans le journal (CSV ou binaire)"""
+    # Mise en file seulement: l'écriture se fait sur le thread du journal
+    probe.record(temp, status)
 
-def adjust_limits_with_joystick():
-    """Ajuster les limites avec le joystick"""
-    global temp_min, temp_max
-    
-    joy_direction = get_joystick_direction()
-    
-    # Debug: afficher direction détectée
-    if hasattr(adjust_limits_with_joystick, 'debug_counter'):
-        adjust_limits_with_joystick.debug_counter += 1
-    else:
-        adjust_limits_with_joystick.debug_counter = 0
-    
-    # Afficher debug toutes les 10 lectures pour diagnostic
-    if adjust_limits_with_joystick.debug_counter % 10 == 0:
-        x, y, btn = ADC.read(0), ADC.read(1), ADC.read(2)
-        print(f"🔍 Debug: X={x:3d}, Y={y:3d}, BTN={btn:3d} → {joy_direction}")
-    
-    if joy_direction == 'up':
-        temp_max += 1.0
-        print(f"🔺 Limite MAXIMALE augmentée: {temp_max:.1f}°C")
-        time.sleep(0.5)  # Éviter répétitions rapides
-        return True
-        
-    elif joy_direction == 'down':
-        temp_max = max(temp_max - 1.0, temp_min + 1.0)  # Sécurité
-        print(f"🔻 Limite MAXIMALE diminuée: {temp_max:.1f}°C")
-        time.sleep(0.5)
-        return True
-        
-    elif joy_direction == 'right':
-        temp_min = min(temp_min + 1.0, temp_max - 1.0)  # Sécurité
-        print(f"▶️ Limite MINIMALE augmentée: {temp_min:.1f}°C")
-        time.sleep(0.5)
-        return True
-        
-    elif joy_direction == 'left':
-        temp_min -= 1.0
-        print(f"◀️ Limite MINIMALE diminuée: {temp_min:.1f}°C")
-        time.sleep(0.5)
-        return True
+def joystick_input():
+    """Thread d'entrée: classe le joystick et publie les événements"""
+    period = 1.0 / JOYSTICK_RATE_HZ
+    while not stop_input.wait(period):
+        # Instantané en mémoire (échantillonneur), aucune lecture du bus
+        frame = sampler.frame(joystick.channels)
+        if None in frame:
+            continue
+        # Changement (anti-rebond) ou répétition limitée par le Joystick
+        event = joystick.update(frame)
+        if event is None or event.direction == 'home':
+            continue
+        try:
+            joystick_events.put_nowait(event)
+        except queue.Full:
+            pass    # boucle principale bloquée: ignorer plutôt qu'accumuler
+
+def adjust_limits_with_joystick(timeout=0.0):
+    """Appliquer les événements joystick reçus, en attendant au plus `timeout` s"""
+    end = time.monotonic() + timeout
+    applied = False
+    while True:
+        remaining = end - time.monotonic()
+        try:
+            if remaining > 0:
+                event = joystick_events.get(timeout=remaining)
+            else:
+                event = joystick_events.get_nowait()
+        except queue.Empty:
+            return applied
         
-    elif joy_direction == 'pressed':
-        print(f"\n📊 ÉTAT ACTUEL:")
-        print(f"   Limites: {temp_min:.1f}°C ← → {temp_max:.1f}°C")
-        print(f"   Violations: MIN={violations_min}, MAX={violations_max}")
-        print(f"   Total violations: {violations_min + violations_max}")
-        time.sleep(0.8)
-        return True
-    
-    return False
+        # Debug: direction détectée et instantané qui l'a produite
+        y, x, btn = joystick.last_frame
+        print(f"🔍 Debug: X={x:3d}, Y={y:3d}, BTN={btn:3d} → {event.direction}")
+        applied = apply_joystick_direction(event.direction) or applied
+
+def apply_joystick_direction(joy_direction):
+    """Appliquer une direction joystick aux limites (sans attente)"""
+    # haut/bas: limite maximale, droite/gauche: limite minimale, bouton: état
+    return probe.adjust(joy_direction)
+
+# Compteurs de la boucle haute fréquence (lus par le thread de rapport)
+rate_stats = {'samples': 0, 'dropped': 0, 'max_loop': 0.0, 'started': None}
+
+def high_rate_loop(rate_hz):
+    """Mesures à `rate_hz` Hz sur échéances absolues, jusqu'à Ctrl+C"""
+    period = 1.0 / rate_hz
+    dev = ADC.device
+    stats = rate_stats
+    # événements joystick consultés ~JOYSTICK_RATE_HZ fois par seconde
+    joystick_every = max(1, int(rate_hz / JOYSTICK_RATE_HZ))
+    deadline = stats['started'] = time.monotonic()
+    while True:
+        start = time.monotonic()
+        # lecture + conversion + seuils; la ligne part dans la file du journal
+        try:
+            burst = dev.read_burst(3, HF_OVERSAMPLE_N)
+        except OSError as e:
+            # erreur I2C: comptée et signalée (débit limité), l'échéancier continue
+            probe.errors += 1
+            probe.alerts.emit(f"⚠️ Erreur lecture I2C: {e}")
+        else:
+            probe.measure(burst)
+            stats['samples'] += 1
+        if stats['samples'] % joystick_every == 0:
+            adjust_limits_with_joystick()
+        busy = time.monotonic() - start
+        if busy > stats['max_loop']:
+            stats['max_loop'] = busy
+
+        deadline += period
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        else:
+            # créneaux manqués: comptés comme perdus, pas rattrapés en rafale
+            missed = int(-remaining / period)
+            stats['dropped'] += missed
+            deadline += missed * period
+
+def high_rate_report(stop, console):
+    """Thread de rapport: lignes d'alerte en attente, cadence réelle, pertes"""
+    last_samples, last_dropped, last_time = 0, 0, time.monotonic()
+    while not stop.wait(HF_REPORT_INTERVAL):
+        while console:
+            print(console.popleft())
+        now = time.monotonic()
+        samples, dropped = rate_stats['samples'], rate_stats['dropped']
+        max_loop, rate_stats['max_loop'] = rate_stats['max_loop'], 0.0
+        print(f"⚡ {(samples - last_samples) / (now - last_time):.1f} Hz (visé {RATE_HZ:g} Hz), "
+              f"créneaux perdus: {dropped - last_dropped} (total {dropped}), "
+              f"journal: {csv_log.rows_dropped} ligne(s) perdue(s), "
+              f"boucle max {max_loop * 1e3:.2f} ms")
+        if checkpoint.due():
+            save_checkpoint(probe.measurements)
+        last_samples, last_dropped, last_time = samples, dropped, now
+    while console:
+        print(console.popleft())
+
+def save_checkpoint(measurement_counter):
+    """Sauvegarder limites et compteurs (fichier remplacé atomiquement)"""
+    checkpoint.save({'log': LOG_FILE, 'measurements': measurement_counter,
+                     'probe': probe.state()})
+
+def resume_from_checkpoint():
+    """Reprendre limites et compteurs du dernier point de reprise (0 sinon)"""
+    start = time.perf_counter()
+    state = checkpoint.load()
+    if state is None:
+        return 0
+    # sans le journal correspondant, les compteurs n'ont plus de sens
+    if state.get('log') != LOG_FILE or not (os.path.exists(LOG_FILE)
+                                            or os.path.exists(index_path(LOG_FILE))):
+        print("ℹ️ Point de reprise ignoré (journal absent): nouveau départ")
+        return 0
+    probe.restore(state['probe'])
+    print(f"♻️ Reprise après {state['measurements']} mesures "
+          f"(violations MIN={probe.violations_min}, MAX={probe.violations_max}, "
+          f"limites {probe.temp_min:.1f}°C - {probe.temp_max:.1f}°C) "
+          f"en {(time.perf_counter() - start) * 1e3:.1f} ms")
+    return int(state['measurements'])
 
 def create_csv_headers():
-    """Créer le fichier CSV avec les en-têtes"""
+    """Ouvrir le journal (en-têtes si nouveau, ajout sinon)"""
     try:
-        with open('results_equipe_xx.csv', 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                'timestamp', 'temperature', 'limit_min', 'limit_max', 
-                'status', 'violations_min', 'violations_max'
-            ])
-        print("✅ Fichier CSV créé avec succès")
+        csv_log.start()
+        print("✅ Fichier CSV prêt (nouvelles mesures ajoutées à la fin)")
         return True
     except Exception as e:
         print(f"❌ Erreur création CSV: {e}")
@@ -208,7 +334,7 @@ def display_instructions():
     """Afficher les instructions d'utilisation"""
     print("\n🌡️ SYSTÈME DE TEMPÉRATURE INTELLIGENT")
     print("=" * 60)
-    print(f"📊 Limites initiales: {temp_min:.1f}°C - {temp_max:.1f}°C")
+    print(f"📊 Limites initiales: {probe.temp_min:.1f}°C - {probe.temp_max:.1f}°C")
     print("\n🕹️ CONTRÔLES JOYSTICK:")
     print("  ↑ (UP)    = Augmenter limite MAXIMALE")
     print("  ↓ (DOWN)  = Diminuer limite MAXIMALE") 
@@ -222,6 +348,40 @@ def display_instructions():
     print("\n🛑 Ctrl+C pour arrêter le système")
     print("=" * 60)
 
+def final_report(measurement_counter):
+    """Afficher le rapport final"""
+    end_time = time.time()
+    duration = end_time - start_time
+    
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL:")
+    print("=" * 60)
+    print(f"⏱️  Durée totale d'exécution: {duration:.1f} secondes")
+    print(f"📏 Nombre total de mesures: {measurement_counter}")
+    if RATE_HZ and rate_stats['started'] is not None:
+        # cadence mesurée depuis le début de la boucle (initialisation exclue)
+        elapsed = time.monotonic() - rate_stats['started']
+        print(f"⚡ Cadence moyenne: {rate_stats['samples'] / elapsed:.1f} Hz (visé {RATE_HZ:g} Hz), "
+              f"créneaux perdus: {rate_stats['dropped']}, "
+              f"lignes de journal perdues: {csv_log.rows_dropped}")
+    print(f"📉 Violations limite inférieure: {probe.violations_min}")
+    print(f"📈 Violations limite supérieure: {probe.violations_max}")
+    print(f"🚨 TOTAL des violations: {probe.violations}")
+    print(f"⏳ Épisodes d'alerte: BAS={alerts.episodes_low}, HAUT={alerts.episodes_high} "
+          f"(non réannoncés: {alerts.alerts_suppressed})")
+    if LOG_ROTATE:
+        print(f"📁 Données sauvegardées dans: {os.path.splitext(LOG_FILE)[0]}_* "
+              f"(partitions par {'heure' if LOG_ROTATE == 'hour' else 'jour'})")
+    else:
+        print(f"📁 Données sauvegardées dans: {LOG_FILE}")
+    print(f"🎯 Limites finales: {probe.temp_min:.1f}°C - {probe.temp_max:.1f}°C")
+    
+    if probe.violations > 0:
+        violation_rate = (probe.violations / measurement_counter) * 100
+        print(f"📊 Taux de violations: {violation_rate:.1f}%")
+    
+    print("=" * 60)
+
 def main():
     """Fonction principale du système"""
     print("🚀 DÉMARRAGE DU SYSTÈME DE TEMPÉRATURE INTELLIGENT")
@@ -231,6 +391,10 @@ def main():
     print("🔧 Initialisation...")
     setup()
     
+    # Limites et compteurs du dernier point de reprise (avant d'ouvrir le
+    # journal: sans journal existant, on repart de zéro)
+    measurement_counter = resume_from_checkpoint()
+    
     # Création du fichier CSV
     if not create_csv_headers():
         print("❌ Impossible de créer le fichier CSV. Arrêt.")
@@ -240,13 +404,16 @@ def main():
     display_instructions()
     
     # Variables de suivi
-    measurement_counter = 0
     last_temp = None
     
+    if RATE_HZ:
+        return run_high_rate()
+    
     try:
         print("\n🏁 DÉBUT DES MESURES:")
         print("-" * 30)
         
+        deadline = time.monotonic()
         while True:
             measurement_counter += 1
             
@@ -261,20 +428,19 @@ def main():
             
             # Sauvegarde des données
             save_to_csv(temp, status)
-            
-            # Gestion du joystick pour ajustement des limites
-            joystick_action = adjust_limits_with_joystick()
+            if checkpoint.due():
+                save_checkpoint(measurement_counter)
             
             # Affichage périodique des statistiques
             if measurement_counter % 10 == 0:
-                print(f"\n📈 STATISTIQUES (après {measurement_counter} mesures):")
-                print(f"   🚨 Total violations: {violations_min + violations_max}")
-                print(f"   📊 Température actuelle: {temp:.1f}°C")
-                print(f"   ⚙️ Limites: {temp_min:.1f}°C - {temp_max:.1f}°C")
+                probe.print_stats(measurement_counter)
             
-            # Pause entre les mesures (sauf si joystick utilisé)
-            if not joystick_action:
-                time.sleep(2.0)
+            # Jusqu'à la prochaine mesure: appliquer les événements joystick
+            # dès leur arrivée, sans décaler la cadence des mesures
+            deadline += MEASURE_INTERVAL
+            if deadline < time.monotonic():
+                deadline = time.monotonic()     # en retard: resynchroniser
+            adjust_limits_with_joystick(timeout=deadline - time.monotonic())
             
     except KeyboardInterrupt:
         print("\n\n🛑 ARRÊT DU SYSTÈME DEMANDÉ")
@@ -284,31 +450,50 @@ def main():
         
     finally:
         # Statistiques finales
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        print("\n" + "=" * 60)
-        print("📊 RAPPORT FINAL:")
-        print("=" * 60)
-        print(f"⏱️  Durée totale d'exécution: {duration:.1f} secondes")
-        print(f"📏 Nombre total de mesures: {measurement_counter}")
-        print(f"📉 Violations limite inférieure: {violations_min}")
-        print(f"📈 Violations limite supérieure: {violations_max}")
-        print(f"🚨 TOTAL des violations: {violations_min + violations_max}")
-        print(f"📁 Données sauvegardées dans: results_equipe_xx.csv")
-        print(f"🎯 Limites finales: {temp_min:.1f}°C - {temp_max:.1f}°C")
-        
-        if violations_min + violations_max > 0:
-            violation_rate = ((violations_min + violations_max) / measurement_counter) * 100
-            print(f"📊 Taux de violations: {violation_rate:.1f}%")
-        
-        print("=" * 60)
+        final_report(measurement_counter)
         
         # Nettoyage
         print("🧹 Nettoyage des ressources...")
+        stop_input.set()
+        sampler.stop()
+        csv_log.close()
+        save_checkpoint(measurement_counter)
         GPIO.cleanup()
         print("✅ Système arrêté proprement")
         print("\n💡 Prochaine étape: Analysez vos données avec le script Pandas!")
 
+def run_high_rate():
+    """Mode haute fréquence: boucle de mesure + thread de rapport"""
+    # Sorties de la boucle mises en file, affichées par le thread de rapport;
+    # au plus 5 lignes d'alerte/s, une ligne d'état agrégée par rapport
+    console = collections.deque(maxlen=1000)
+    alerts.out = console.append
+    alerts.limiter = RateLimiter(5, out=console.append)
+    alerts.status_interval = HF_REPORT_INTERVAL
+    # Le journal ne doit jamais bloquer la boucle: lignes perdues comptées
+    csv_log.on_full = 'drop'
+    stop_report = threading.Event()
+    reporter = threading.Thread(target=high_rate_report, args=(stop_report, console),
+                                name='high-rate-report', daemon=True)
+    print(f"\n⚡ MODE HAUTE FRÉQUENCE: {RATE_HZ:g} Hz, rafales de {HF_OVERSAMPLE_N} conversions")
+    reporter.start()
+    try:
+        high_rate_loop(RATE_HZ)
+    except KeyboardInterrupt:
+        print("\n\n🛑 ARRÊT DU SYSTÈME DEMANDÉ")
+    except Exception as e:
+        print(f"\n❌ ERREUR SYSTÈME: {e}")
+    finally:
+        stop_report.set()
+        reporter.join()
+        final_report(probe.measurements)
+        print("🧹 Nettoyage des ressources...")
+        stop_input.set()
+        sampler.stop()
+        csv_log.close()
+        save_checkpoint(probe.measurements)
+        GPIO.cleanup()
+        print("✅ Système arrêté proprement")
+
 if __name__ == '__main__':
     main()
\ No newline at end of file